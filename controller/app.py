@@ -313,12 +313,11 @@ async def resolve_inputs_from_request(body: Dict[str, Any], app_state) -> tuple[
             # Allocate forwarders using the singleton bot
             participants_out: List[Dict[str, Any]] = []
             room = body.get("room", "unknown")
-            endpoint_ids = []
-            for ep_obj in endpoint_objects:
+            endpoint_ids = [ep_obj["id"] for ep_obj in endpoint_objects]
+            allocs = await bot.allocate_forwarders([(room, ep_id) for ep_id in endpoint_ids])
+            for ep_obj, alloc in zip(endpoint_objects, allocs):
                 ep_id = ep_obj["id"]
                 ep_name = ep_obj["name"]
-                endpoint_ids.append(ep_id)
-                alloc = await bot.allocate_forwarder(room, ep_id)
                 fwd = alloc.get("forwarder") or {}
                 ip = fwd.get("ip") or "127.0.0.1"
                 port = fwd.get("port") or 50000
@@ -345,7 +344,10 @@ async def resolve_inputs_from_request(body: Dict[str, Any], app_state) -> tuple[
         endpoints_ids = [ep["id"] for ep in endpoint_objects]
         # Build name lookup map
         name_map = {ep["id"]: ep["name"] for ep in endpoint_objects}
-        allocation = client.allocate_audio_forwarders(room=body["room"], endpoints=endpoints_ids)
+        # Colibri2Client is synchronous (httpx.Client); keep its round-trip off the event loop
+        allocation = await asyncio.to_thread(
+            client.allocate_audio_forwarders, room=body["room"], endpoints=endpoints_ids
+        )
         session_id = allocation.get("session_id") or allocation.get("sessionId")
         participants: List[Dict[str, Any]] = []
         for ep in allocation.get("endpoints", []):
@@ -395,8 +397,7 @@ async def stop_and_release(rec_id: str, app_state=None) -> None:
                     try:
                         room = session_meta.get("room", "unknown")
                         endpoint_ids = session_meta.get("endpoint_ids", [])
-                        for ep_id in endpoint_ids:
-                            await bot.release_forwarder(room, ep_id)
+                        await bot.release_forwarders([(room, ep_id) for ep_id in endpoint_ids])
                     except Exception:
                         # non-fatal; continue cleanup
                         pass
@@ -404,7 +405,7 @@ async def stop_and_release(rec_id: str, app_state=None) -> None:
         elif session_meta.get("session_id"):
             try:
                 client = build_colibri2_from_env()
-                client.release(session_meta["session_id"])
+                await asyncio.to_thread(client.release, session_meta["session_id"])
             except Exception:
                 # non-fatal; continue cleanup
                 pass
@@ -603,10 +604,7 @@ async def api_start_recording(request: Request, x_auth_token: str | None = Heade
         raise HTTPException(status_code=503, detail="XMPP bot not ready")
     
     # Construct full room JID
-    if "@" not in room_id:
-        full_room_jid = f"{room_id}@muc.{bot.settings.domain}"
-    else:
-        full_room_jid = room_id
+    full_room_jid = bot.room_to_muc(room_id)
     
     try:
         # Step 1: Join MUC (if not already in it)
@@ -670,10 +668,7 @@ async def api_stop_recording(request: Request, x_auth_token: str | None = Header
         raise HTTPException(status_code=503, detail="XMPP bot not ready")
     
     # Construct full room JID
-    if "@" not in room_id:
-        full_room_jid = f"{room_id}@muc.{bot.settings.domain}"
-    else:
-        full_room_jid = room_id
+    full_room_jid = bot.room_to_muc(room_id)
     
     try:
         # Step 1: Stop multitrack recording
@@ -6,8 +6,12 @@ Converts between XMPP Jingle stanzas (XEP-0166) and SDP format used by aiortc.
 
 from xml.etree import ElementTree as ET
 from typing import Dict, List, Tuple
+import copy
 import re
 
+# Retransmission/FEC payloads are not negotiated by the recorder
+_SKIP_CODECS = ('rtx', 'red', 'ulpfec')
+
 
 def jingle_to_sdp(jingle_element: ET.Element) -> str:
     """
@@ -64,7 +68,7 @@ def jingle_to_sdp(jingle_element: ET.Element) -> str:
         payload_types = description.findall('{urn:xmpp:jingle:apps:rtp:1}payload-type')
 
         # Build format list (payload type IDs)
-        fmt_list = [pt.get('id') for pt in payload_types if pt.get('name') not in ['rtx', 'red', 'ulpfec']]
+        fmt_list = [pt.get('id') for pt in payload_types if pt.get('name') not in _SKIP_CODECS]
 
         # m= line
         sdp_lines.append(f"m={media_type} 9 UDP/TLS/RTP/SAVPF {' '.join(fmt_list)}")
@@ -109,7 +113,7 @@ def jingle_to_sdp(jingle_element: ET.Element) -> str:
             clockrate = pt.get('clockrate')
             channels = pt.get('channels')
 
-            if pt_name in ['rtx', 'red', 'ulpfec']:
+            if pt_name in _SKIP_CODECS:
                 continue  # Skip retransmission/FEC for now
 
             if channels and channels != '1':
@@ -174,9 +178,19 @@ def extract_ssrcs_from_jingle(jingle_element: ET.Element) -> Dict[str, Dict[str,
         sources = description.findall('{urn:xmpp:jingle:apps:rtp:ssma:0}source')
         
         for source in sources:
+            # Store first SSRC found for this media type
+            # (Multiple SSRCs per media type possible for simulcast, but we'll use primary)
+            if media_type in ssrcs:
+                break  # Don't parse parameters of sources we'd discard
+
             ssrc_value = source.get('ssrc')
             if not ssrc_value:
                 continue
+            try:
+                ssrc = int(ssrc_value)
+            except ValueError:
+                # Invalid SSRC format, skip
+                continue
                 
             # Extract SSRC parameters (cname, msid, mslabel, etc.)
             params = {}
@@ -186,24 +200,38 @@ def extract_ssrcs_from_jingle(jingle_element: ET.Element) -> Dict[str, Dict[str,
                 if param_name and param_value:
                     params[param_name] = param_value
             
-            # Store first SSRC found for this media type
-            # (Multiple SSRCs per media type possible for simulcast, but we'll use primary)
-            if media_type not in ssrcs:
-                try:
-                    ssrcs[media_type] = {
-                        'ssrc': int(ssrc_value),
-                        'cname': params.get('cname', ''),
-                        'msid': params.get('msid', ''),
-                        'mslabel': params.get('mslabel', ''),
-                        'label': params.get('label', '')
-                    }
-                except ValueError:
-                    # Invalid SSRC format, skip
-                    pass
+            ssrcs[media_type] = {
+                'ssrc': ssrc,
+                'cname': params.get('cname', ''),
+                'msid': params.get('msid', ''),
+                'mslabel': params.get('mslabel', ''),
+                'label': params.get('label', '')
+            }
     
     return ssrcs
 
 
+def _build_accept_templates() -> Tuple[ET.Element, ET.Element]:
+    """
+    Build the fixed skeletons of a session-accept: the <jingle> element with its
+    (empty) BUNDLE group, and one <content> with empty <description>/<transport>.
+
+    `sdp_to_jingle_accept` deep-copies these and only fills in per-session values.
+    """
+    jingle = ET.Element("{urn:xmpp:jingle:1}jingle", {"action": "session-accept"})
+    # Bundle group (Standard for WebRTC)
+    ET.SubElement(jingle, "{urn:xmpp:jingle:apps:grouping:0}group", {"semantics": "BUNDLE"})
+
+    # Usually 'both' for a recorder
+    content = ET.Element("{urn:xmpp:jingle:1}content", {"creator": "initiator", "senders": "both"})
+    ET.SubElement(content, "{urn:xmpp:jingle:apps:rtp:1}description")
+    ET.SubElement(content, "{urn:xmpp:jingle:transports:ice-udp:1}transport")
+    return jingle, content
+
+
+_JINGLE_ACCEPT_TEMPLATE, _ACCEPT_CONTENT_TEMPLATE = _build_accept_templates()
+
+
 def sdp_to_jingle_accept(sdp_answer: str, session_id: str, initiator: str, responder: str) -> ET.Element:
     """
     Converts aiortc's Local SDP Answer into a robust Jingle session-accept packet.
@@ -221,16 +249,12 @@ def sdp_to_jingle_accept(sdp_answer: str, session_id: str, initiator: str, respo
     # Parse the SDP into a structured format per media section
     media_sections = _parse_sdp_media_sections(sdp_answer)
 
-    # Build the Jingle element
-    jingle = ET.Element("{urn:xmpp:jingle:1}jingle")
-    jingle.set("action", "session-accept")
+    # Build the Jingle element from the prebuilt skeleton (group is its first child)
+    jingle = copy.deepcopy(_JINGLE_ACCEPT_TEMPLATE)
     jingle.set("sid", session_id)
     jingle.set("initiator", initiator)
     jingle.set("responder", responder)
-
-    # Bundle group (Standard for WebRTC)
-    group = ET.Element("{urn:xmpp:jingle:apps:grouping:0}group")
-    group.set("semantics", "BUNDLE")
+    group = jingle[0]
 
     for media_type, section in media_sections.items():
         # Add content to bundle group
@@ -239,14 +263,12 @@ def sdp_to_jingle_accept(sdp_answer: str, session_id: str, initiator: str, respo
         content_ref.set("name", content_name)
         group.append(content_ref)
 
-        # <content>
-        content = ET.Element("{urn:xmpp:jingle:1}content")
-        content.set("creator", "initiator")
+        # <content> with empty <description> and <transport> children
+        content = copy.deepcopy(_ACCEPT_CONTENT_TEMPLATE)
         content.set("name", content_name)
-        content.set("senders", "both")  # Usually 'both' for a recorder
+        desc, transport = content
 
         # <description> (The part required to fix the bug)
-        desc = ET.Element("{urn:xmpp:jingle:apps:rtp:1}description")
         desc.set("media", media_type)
 
         # Add Payloads (Codecs)
@@ -284,10 +306,7 @@ def sdp_to_jingle_accept(sdp_answer: str, session_id: str, initiator: str, respo
             ext.set("uri", ext_uri)
             desc.append(ext)
 
-        content.append(desc)
-
         # <transport>
-        transport = ET.Element("{urn:xmpp:jingle:transports:ice-udp:1}transport")
         transport.set("ufrag", section['ufrag'])
         transport.set("pwd", section['pwd'])
 
@@ -298,10 +317,8 @@ def sdp_to_jingle_accept(sdp_answer: str, session_id: str, initiator: str, respo
             fp.text = section['fingerprint']['value']
             transport.append(fp)
 
-        content.append(transport)
         jingle.append(content)
 
-    jingle.insert(0, group)
     return jingle
 
 
@@ -1,10 +1,23 @@
 import asyncio
+import copy
+import functools
+import inspect
 import json
 import logging
 import os
-from typing import Dict, Any, Optional, Callable, List
-
-import requests
+import random
+import ssl
+import sys
+import time
+import traceback
+from collections import defaultdict
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timezone
+from typing import Dict, DefaultDict, Any, Optional, Callable, List, Tuple
+from urllib.parse import urlencode
+
+import httpx
+import ijson
 import slixmpp
 from slixmpp import ClientXMPP, ComponentXMPP
 from slixmpp.xmlstream import ET
@@ -15,6 +28,90 @@ from xmpp_config import XMPPSettings, load_xmpp_settings
 from jingle_sdp import jingle_to_sdp, sdp_to_jingle_accept, extract_ssrcs_from_jingle
 
 
+# Clark-notation tags shared by the presence/IQ handlers (interned: they are
+# compared and hashed on every stanza)
+NS_JITSI_AUDIO = sys.intern('{http://jitsi.org/jitmeet/audio}audiomuted')
+NS_JITSI_VIDEO = sys.intern('{http://jitsi.org/jitmeet/video}videomuted')
+NS_STATS_ID = sys.intern('{http://jitsi.org/jitmeet}stats-id')
+NS_COLIBRI_CONF_MODIFY = sys.intern('{urn:xmpp:jitsi-videobridge:colibri2}conference-modify')
+NS_COLIBRI_CONF = sys.intern('{http://jitsi.org/protocol/colibri}conference')
+NS_COLIBRI_CONTENT = sys.intern('{http://jitsi.org/protocol/colibri}content')
+NS_COLIBRI_CHANNEL = sys.intern('{http://jitsi.org/protocol/colibri}channel')
+NS_COLIBRI_PAYLOAD = sys.intern('{http://jitsi.org/protocol/colibri}payload-type')
+NS_ICE_TRANSPORT = sys.intern('{urn:xmpp:jingle:transports:ice-udp:1}transport')
+NS_ICE_CAND = sys.intern('{urn:xmpp:jingle:transports:ice-udp:1}candidate')
+NS_JINGLE = sys.intern('{urn:xmpp:jingle:1}jingle')
+NS_JINGLE_CONTENT = sys.intern('{urn:xmpp:jingle:1}content')
+NS_FOCUS_BRIDGE_SESSION = sys.intern('{http://jitsi.org/protocol/focus}bridge-session')
+NS_DISCO_FEATURE = sys.intern('{http://jabber.org/protocol/disco#info}feature')
+
+# Bare-JID prefix of the videobridge occupant in the brewery MUC
+_JVB_PREFIX = sys.intern("jvb@")
+
+
+# Static part of a Colibri v1 audio channel allocation:
+# - 'initiator=true' asks JVB to start the ICE connectivity checks
+# - 3 minutes expiry (refresh with simple IQs)
+# - Standard Opus payload type
+# - An empty ICE transport tells JVB "Allocate ICE candidates for me"
+_COLIBRI_V1_XML = (
+    "<conference xmlns='http://jitsi.org/protocol/colibri'>"
+    "<content name='audio'>"
+    "<channel initiator='true' expire='180'>"
+    "<payload-type id='111' name='opus' clockrate='48000' channels='2'/>"
+    "<transport xmlns='urn:xmpp:jingle:transports:ice-udp:1'/>"
+    "</channel>"
+    "</content>"
+    "</conference>"
+)
+
+
+def _build_colibri_v1_template() -> ET.Element:
+    """
+    Parse the static Colibri v1 allocation once.
+
+    Only the conference 'id' varies between allocations, so this tree is
+    `copy.deepcopy`'d (C-level, several times cheaper than re-parsing the
+    string) per request instead of being rebuilt.
+    """
+    return ET.fromstring(_COLIBRI_V1_XML)
+
+
+_COLIBRI_V1_TEMPLATE = _build_colibri_v1_template()
+
+# connect() signature changed between slixmpp versions:
+# 1.8.x: connect(address=None) where address is a tuple (host, port)
+# 1.9+: connect(host=None, port=None) as separate keyword args
+_SLIX_CONNECT_NEW_API = "host" in inspect.signature(ClientXMPP.connect).parameters
+
+
+def _find_descendant(elem: ET.Element, tag: str) -> Optional[ET.Element]:
+    """First element with `tag` below `elem`; `iter(tag)` walks in C, a `.//` path goes through Python ElementPath."""
+    return next(elem.iter(tag), None)
+
+
+@functools.lru_cache(maxsize=None)
+def _dev_ssl_context() -> ssl.SSLContext:
+    """
+    TLS context without certificate verification (Prosody uses self-signed certs in development).
+
+    Built on first use and shared: creating a default context loads the system CA bundle.
+    """
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+def _int_or(value: Optional[str], default: Optional[int] = 0) -> Optional[int]:
+    """`int(value)` for a (possibly signed) decimal attribute string, else `default` - no try/except."""
+    if not value:
+        return default
+    # At most one sign; isdecimal() (unlike isdigit()) only accepts characters int() parses
+    digits = value[1:] if value[0] == '-' else value
+    return int(value) if digits.isdecimal() else default
+
+
 class Colibri2IQ:
     """
     Colibri2 IQ builder/parser for jitsi-videobridge stable-10590.
@@ -26,6 +123,17 @@ class Colibri2IQ:
     ICE_UDP_NS = "urn:xmpp:jingle:transports:ice-udp:1"
     SOURCES_NS = "urn:xmpp:jitsi:colibri2:sources"
 
+    # Clark-notation tags, built and interned once at class load
+    _IQ_TAG = sys.intern("{jabber:client}iq")
+    _CONF_MODIFY = sys.intern(f"{{{NAMESPACE}}}conference-modify")
+    _CONF_MODIFIED = sys.intern(f"{{{NAMESPACE}}}conference-modified")
+    _ENDPOINT = sys.intern(f"{{{NAMESPACE}}}endpoint")
+    _MEDIA = sys.intern(f"{{{NAMESPACE}}}media")
+    _PAYLOAD_TYPE = sys.intern(f"{{{NAMESPACE}}}payload-type")
+    _TRANSPORT = sys.intern(f"{{{NAMESPACE}}}transport")
+    _ICE_CANDIDATE = sys.intern(f"{{{ICE_UDP_NS}}}candidate")
+    _SOURCE = sys.intern(f"{{{SOURCES_NS}}}source")
+
     @staticmethod
     def build_allocate(conference_id: str, endpoint_id: str) -> ET.Element:
         """
@@ -34,24 +142,32 @@ class Colibri2IQ:
         This requests JVB to create/allocate an endpoint with audio media
         and transport configured for receiving RTP.
         """
-        iq = ET.Element("{jabber:client}iq", {"type": "set"})
+        # Only meeting-id and endpoint id vary; clone the prebuilt tree
+        iq = copy.deepcopy(Colibri2IQ._ALLOCATE_TEMPLATE)
+        conf_modify = iq[0]
+        conf_modify.set("meeting-id", conference_id)
+        conf_modify[0].set("id", endpoint_id)
+        return iq
+
+    @staticmethod
+    def _build_allocate_template() -> ET.Element:
+        """Static part of `build_allocate`, built once into `_ALLOCATE_TEMPLATE`."""
+        iq = ET.Element(Colibri2IQ._IQ_TAG, {"type": "set"})
 
-        # conference-modify element with meeting-id and create flag
+        # conference-modify element with create flag (meeting-id is set per request)
         conf_modify = ET.SubElement(
             iq,
-            f"{{{Colibri2IQ.NAMESPACE}}}conference-modify",
+            Colibri2IQ._CONF_MODIFY,
             {
-                "meeting-id": conference_id,
                 "create": "true"
             }
         )
 
-        # endpoint element
+        # endpoint element (id is set per request)
         endpoint = ET.SubElement(
             conf_modify,
-            f"{{{Colibri2IQ.NAMESPACE}}}endpoint",
+            Colibri2IQ._ENDPOINT,
             {
-                "id": endpoint_id,
                 "create": "true"
             }
         )
@@ -59,14 +175,14 @@ class Colibri2IQ:
         # media element for audio
         media = ET.SubElement(
             endpoint,
-            f"{{{Colibri2IQ.NAMESPACE}}}media",
+            Colibri2IQ._MEDIA,
             {"type": "audio"}
         )
 
         # Add common Opus payload type
         ET.SubElement(
             media,
-            f"{{{Colibri2IQ.NAMESPACE}}}payload-type",
+            Colibri2IQ._PAYLOAD_TYPE,
             {
                 "id": "111",
                 "name": "opus",
@@ -78,7 +194,7 @@ class Colibri2IQ:
         # transport element (required for RTP forwarders)
         transport = ET.SubElement(
             endpoint,
-            f"{{{Colibri2IQ.NAMESPACE}}}transport"
+            Colibri2IQ._TRANSPORT
         )
 
         return iq
@@ -91,50 +207,48 @@ class Colibri2IQ:
         Extracts IP, port, SSRC, and payload type from the response.
         """
         # Find conference-modified element
-        conf_modified = response_xml.find(f".//{{{Colibri2IQ.NAMESPACE}}}conference-modified")
+        conf_modified = _find_descendant(response_xml, Colibri2IQ._CONF_MODIFIED)
         if conf_modified is None:
             raise ValueError("No conference-modified element in response")
 
         # Find endpoint
-        endpoint = conf_modified.find(f".//{{{Colibri2IQ.NAMESPACE}}}endpoint")
+        endpoint = _find_descendant(conf_modified, Colibri2IQ._ENDPOINT)
         if endpoint is None:
             raise ValueError("No endpoint in response")
 
         endpoint_id = endpoint.get("id")
 
+        # One walk over the endpoint subtree picks up the first candidate, source
+        # and payload-type (candidates are the most numerous, so tested first)
+        candidate = source = payload_type = None
+        for elem in endpoint.iter():
+            tag = elem.tag
+            if tag == Colibri2IQ._ICE_CANDIDATE:
+                if candidate is None:
+                    candidate = elem
+            elif tag == Colibri2IQ._SOURCE:
+                if source is None:
+                    source = elem
+            elif tag == Colibri2IQ._PAYLOAD_TYPE:
+                if payload_type is None:
+                    payload_type = elem
+
         # Extract transport info - look for ICE candidate
-        candidate = endpoint.find(f".//{{{Colibri2IQ.ICE_UDP_NS}}}candidate")
         if candidate is not None:
             ip = candidate.get("ip")
-            port = int(candidate.get("port"))
+            port = _int_or(candidate.get("port"), 50000)
         else:
-            # Fallback: try to find transport with relay info
-            transport = endpoint.find(f".//{{{Colibri2IQ.NAMESPACE}}}transport")
             # If no candidate, this might be a relay or we need to handle differently
             ip = "127.0.0.1"  # Default fallback
             port = 50000  # Default fallback
 
         # Extract SSRC from sources
-        ssrc = None
-        source = endpoint.find(f".//{{{Colibri2IQ.SOURCES_NS}}}source")
-        if source is not None:
-            ssrc_str = source.get("id")
-            if ssrc_str:
-                try:
-                    ssrc = int(ssrc_str)
-                except ValueError:
-                    pass
+        ssrc = _int_or(source.get("id"), None) if source is not None else None
 
         # Extract payload type
         pt = 111  # Default Opus
-        payload_type = endpoint.find(f".//{{{Colibri2IQ.NAMESPACE}}}payload-type")
         if payload_type is not None:
-            pt_str = payload_type.get("id")
-            if pt_str:
-                try:
-                    pt = int(pt_str)
-                except ValueError:
-                    pass
+            pt = _int_or(payload_type.get("id"), pt)
 
         return {
             "endpoint_id": endpoint_id,
@@ -145,44 +259,387 @@ class Colibri2IQ:
         }
 
     @staticmethod
-    def build_release(conference_id: str, endpoint_id: str) -> ET.Element:
+    def build_release_modify(conference_id: str, endpoint_ids: List[str]) -> ET.Element:
         """
-        Build a conference-modify IQ to release/expire an endpoint.
+        Build the conference-modify payload that expires endpoints, to append to a slixmpp Iq.
 
-        This requests JVB to remove an endpoint from a conference.
+        This requests JVB to remove the endpoints from a conference.
         """
-        iq = ET.Element("{jabber:client}iq", {"type": "set"})
-
         # conference-modify element with meeting-id (no create flag)
-        conf_modify = ET.SubElement(
-            iq,
-            f"{{{Colibri2IQ.NAMESPACE}}}conference-modify",
-            {"meeting-id": conference_id}
-        )
+        conf_modify = ET.Element(Colibri2IQ._CONF_MODIFY, {"meeting-id": conference_id})
 
-        # endpoint element with expire flag
-        ET.SubElement(
-            conf_modify,
-            f"{{{Colibri2IQ.NAMESPACE}}}endpoint",
-            {
-                "id": endpoint_id,
-                "expire": "true"
+        # one endpoint element with expire flag per endpoint
+        for endpoint_id in endpoint_ids:
+            ET.SubElement(
+                conf_modify,
+                Colibri2IQ._ENDPOINT,
+                {
+                    "id": endpoint_id,
+                    "expire": "true"
+                }
+            )
+
+        return conf_modify
+
+
+Colibri2IQ._ALLOCATE_TEMPLATE = Colibri2IQ._build_allocate_template()
+
+
+@dataclass(slots=True)
+class Participant:
+    """
+    Conference participant tracked from MUC presence (see `_parse_participant_from_presence`).
+
+    Fixed-layout record instead of a per-presence dict; converted to a plain dict
+    only at the API boundary (`get_conference_participants`).
+    """
+    jid: str
+    display_name: Optional[str] = None
+    stats_id: Optional[str] = None
+    audio_muted: bool = False
+    video_muted: bool = False
+    joined_at: float = 0.0  # Epoch seconds; ISO-formatted only in to_dict()
+    ssrcs: Dict[str, Any] = field(default_factory=dict)  # From Jingle session-initiate
+    forwarder: Optional[Dict[str, Any]] = None  # Set by allocate_forwarder_for_participant
+    nick: str = ''
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain-dict form for API output, with `joined_at` as an ISO 8601 UTC string."""
+        data = asdict(self)
+        data["joined_at"] = _iso_utc_second(int(self.joined_at))
+        return data
+
+
+@functools.lru_cache(maxsize=256)
+def _iso_utc_second(epoch_second: int) -> str:
+    """ISO 8601 UTC string ("2024-11-20T12:00:00Z") for a whole epoch second, cached across API calls."""
+    return datetime.fromtimestamp(epoch_second, timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+
+
+@functools.lru_cache(maxsize=128)
+def _colibri2_conference_url(jvb_rest_url: str, conference_id: str) -> str:
+    """JVB REST URL of a Colibri2 conference; bounded, as conference IDs are per-meeting UUIDs."""
+    return f"{jvb_rest_url}/colibri/v2/conferences/{conference_id}"
+
+
+# Minimum level for messages sent through _LogMixin._log (DEBUG, INFO, WARNING, ERROR)
+_LOG_LEVEL = getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO)
+
+
+class _LogMixin:
+    """
+    Level-gated logging on top of the plain `logger(msg)` callable the bots receive.
+
+    Messages are %-style format strings; formatting only happens when the level
+    is enabled, so disabled debug lines cost a comparison.
+    """
+    log_level: int = _LOG_LEVEL
+    # Tracebacks are only formatted when set (XMPPBot reads it from XMPP_DEBUG)
+    debug: bool = False
+
+    def _log(self, level: int, fmt: str, *args):
+        if level >= self.log_level:
+            self.logger(fmt % args if args else fmt)
+
+    def _log_traceback(self):
+        """Log the traceback of the exception being handled, if XMPP_DEBUG is enabled."""
+        if self.debug:
+            self.logger(f"Traceback: {traceback.format_exc()}")
+
+    def _log_exception(self, desc: str, e: BaseException):
+        """Log `desc: e` at ERROR level, followed by the traceback if XMPP_DEBUG is enabled."""
+        self._log(logging.ERROR, "%s: %s", desc, e)
+        self._log_traceback()
+
+
+class _ColibriV1Mixin:
+    """
+    Colibri v1 channel allocation and the forwarder API built on it, shared by both bots.
+
+    Expects `bridge_jid`, `logger` and the slixmpp IQ factories of the bot it is mixed into.
+    """
+
+    async def allocate_colibri_v1(self, conference_id: str, endpoint_id: str) -> Dict[str, Any]:
+        """
+        Allocates an audio channel using the legacy Colibri v1 protocol.
+        Namespace: http://jitsi.org/protocol/colibri
+        """
+        from slixmpp.exceptions import IqError, IqTimeout
+
+        if not self.bridge_jid:
+            raise RuntimeError("Bridge JID not discovered")
+
+        self.logger(f"📡 Allocating Colibri v1 Channel on {self.bridge_jid}...")
+
+        # 1. Construct the IQ
+        iq = self.make_iq_set(ito=self.bridge_jid)
+
+        # <conference xmlns='http://jitsi.org/protocol/colibri' id='...'> with one audio channel
+        # Note: If conference_id is None/Empty, JVB creates a new one.
+        conference = copy.deepcopy(_COLIBRI_V1_TEMPLATE)
+        if conference_id:
+            conference.set('id', conference_id)
+        iq.append(conference)
+
+        try:
+            # 2. Send and Await Reply
+            result = await iq.send(timeout=10)
+            self.logger("✅ Colibri v1 Allocation Success!")
+
+            # 3. Parse Response (Extract JVB's ICE Candidates)
+            # The response mirrors the request but fills in 'id', 'ufrag', 'pwd', and 'candidates'
+            # Single-tag finds run in C on the raw element (the slixmpp Iq wrapper has no find())
+            resp_conf = result.xml.find(NS_COLIBRI_CONF)
+            resp_content = resp_conf.find(NS_COLIBRI_CONTENT)
+            resp_channel = resp_content.find(NS_COLIBRI_CHANNEL)
+            allocation_data = self._parse_colibri_v1_channel(resp_conf, resp_channel)
+
+            self.logger(f"📦 JVB Candidates: {len(allocation_data['candidates'])} found")
+            self.logger(f"📦 Conference ID: {allocation_data['conference_id']}")
+            self.logger(f"📦 Channel ID: {allocation_data['channel_id']}")
+
+            return allocation_data
+
+        except IqError as e:
+            error_condition = e.iq['error']['condition']
+            self.logger(f"❌ JVB rejected allocation: {error_condition}")
+            self.logger(f"Full error IQ: {e.iq}")
+            raise
+        except IqTimeout:
+            self.logger("❌ JVB allocation timed out")
+            raise
+        except Exception as e:
+            # repr keeps the exception type, which the bare message loses for unexpected errors
+            self._log(logging.ERROR, "❌ Unexpected error during Colibri v1 allocation: %r", e)
+            self._log_traceback()
+            raise
+
+    async def allocate_colibri_v1_batch(self, conference_id: str, endpoint_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Allocates one Colibri v1 audio channel per endpoint in a single IQ.
+
+        Each <channel> carries an 'endpoint' attribute which JVB echoes back,
+        so N endpoints cost one round-trip instead of N.
+
+        Args:
+            conference_id: Colibri conference ID
+            endpoint_ids: Endpoints to allocate channels for
+
+        Returns:
+            Allocation dicts (as from `allocate_colibri_v1`), in `endpoint_ids` order
+        """
+        if not self.bridge_jid:
+            raise RuntimeError("Bridge JID not discovered")
+
+        self.logger(f"📡 Allocating {len(endpoint_ids)} Colibri v1 Channels on {self.bridge_jid}...")
+
+        iq = self.make_iq_set(ito=self.bridge_jid)
+        conference = copy.deepcopy(_COLIBRI_V1_TEMPLATE)
+        if conference_id:
+            conference.set('id', conference_id)
+        content = conference.find(NS_COLIBRI_CONTENT)
+        channel_template = content.find(NS_COLIBRI_CHANNEL)
+        content.remove(channel_template)
+        for endpoint_id in endpoint_ids:
+            channel = copy.deepcopy(channel_template)
+            channel.set('endpoint', endpoint_id)
+            content.append(channel)
+        iq.append(conference)
+
+        result = await iq.send(timeout=10)
+
+        resp_conf = result.xml.find(NS_COLIBRI_CONF)
+        resp_content = resp_conf.find(NS_COLIBRI_CONTENT)
+        resp_channels = resp_content.findall(NS_COLIBRI_CHANNEL)
+        by_endpoint = {ch.get('endpoint'): ch for ch in resp_channels}
+
+        allocations = []
+        for index, endpoint_id in enumerate(endpoint_ids):
+            # Fall back to request order if JVB didn't echo the endpoint attribute
+            resp_channel = by_endpoint.get(endpoint_id)
+            if resp_channel is None and len(resp_channels) == len(endpoint_ids):
+                resp_channel = resp_channels[index]
+            if resp_channel is None:
+                raise ValueError(f"No channel for endpoint {endpoint_id} in batched allocation")
+            allocations.append(self._parse_colibri_v1_channel(resp_conf, resp_channel))
+
+        self.logger(f"✅ Colibri v1 batch allocation success ({len(allocations)} channels)")
+        return allocations
+
+    @staticmethod
+    def _parse_colibri_v1_channel(resp_conf: ET.Element, resp_channel: ET.Element) -> Dict[str, Any]:
+        """
+        Allocation data for one <channel> of a Colibri v1 response.
+        The response mirrors the request but fills in 'id', 'ufrag', 'pwd', and 'candidates'.
+        """
+        resp_transport = resp_channel.find(NS_ICE_TRANSPORT)
+
+        allocation_data = {
+            "conference_id": resp_conf.get('id'),
+            "channel_id": resp_channel.get('id'),
+            "ufrag": resp_transport.get('ufrag') if resp_transport is not None else None,
+            "pwd": resp_transport.get('pwd') if resp_transport is not None else None,
+            "candidates": [],
+            # Only the first candidate's address is used for the forwarder
+            "first_candidate": None,
+        }
+
+        if resp_transport is not None:
+            # Interned Clark tag (no per-call QName build); iterfind streams the
+            # children and each candidate's attrib mapping is read directly
+            allocation_data["candidates"] = [
+                {
+                    "ip": attrs.get('ip'),
+                    "port": attrs.get('port'),
+                    "proto": attrs.get('protocol'),
+                    "type": attrs.get('type'),
+                    "foundation": attrs.get('foundation'),
+                    "component": attrs.get('component'),
+                    "priority": attrs.get('priority')
+                }
+                for attrs in (cand.attrib for cand in resp_transport.iterfind(NS_ICE_CAND))
+            ]
+            if allocation_data["candidates"]:
+                allocation_data["first_candidate"] = allocation_data["candidates"][0]
+
+        return allocation_data
+
+    async def allocate_forwarder(self, conference_id: str, endpoint_id: str) -> Dict[str, Any]:
+        """
+        Allocate a forwarder using Colibri v1 (legacy protocol).
+        Colibri2 is not supported by this JVB version.
+        """
+        self.logger(f"Allocating forwarder for conference={conference_id}, endpoint={endpoint_id}")
+
+        try:
+            # Use Colibri v1 allocation
+            allocation_data = await self.allocate_colibri_v1(conference_id, endpoint_id)
+            return self._forwarder_response(allocation_data)
+        except Exception as e:
+            self.logger(f"Failed to allocate forwarder: {e}")
+            raise
+
+    async def allocate_forwarders(self, pairs: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Allocate forwarders for several (conference_id, endpoint_id) pairs.
+
+        Endpoints of the same conference share one batched Colibri v1 IQ; if JVB
+        rejects the batch (IqError), that conference falls back to concurrent single
+        allocations. Timeouts and other errors are raised without a fallback.
+
+        Returns:
+            Responses in the format of `allocate_forwarder`, in `pairs` order
+        """
+        by_conference: Dict[str, List[str]] = {}
+        for conference_id, endpoint_id in pairs:
+            by_conference.setdefault(conference_id, []).append(endpoint_id)
+
+        from slixmpp.exceptions import IqError
+
+        responses: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for conference_id, endpoint_ids in by_conference.items():
+            self.logger(f"Allocating {len(endpoint_ids)} forwarders for conference={conference_id}")
+            try:
+                allocations = await self.allocate_colibri_v1_batch(conference_id, endpoint_ids)
+            except IqError as e:
+                # Only a rejected batch is retried per endpoint; a timeout or other
+                # failure propagates rather than sending N more IQs to a struggling bridge
+                self.logger(f"⚠️  Batched allocation rejected ({e.iq['error']['condition']}), "
+                            f"allocating endpoints individually")
+                allocations = await asyncio.gather(
+                    *(self.allocate_colibri_v1(conference_id, ep) for ep in endpoint_ids)
+                )
+            for endpoint_id, allocation_data in zip(endpoint_ids, allocations):
+                responses[(conference_id, endpoint_id)] = self._forwarder_response(allocation_data)
+
+        return [responses[pair] for pair in pairs]
+
+    def _forwarder_response(self, allocation_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Return allocation data in the forwarder format callers expect."""
+        first = allocation_data["first_candidate"]
+        return {
+            "id": allocation_data["channel_id"],
+            "conference_id": allocation_data["conference_id"],
+            "bridge_jid": self.bridge_jid,
+            "ufrag": allocation_data["ufrag"],
+            "pwd": allocation_data["pwd"],
+            "candidates": allocation_data["candidates"],
+            "forwarder": {
+                # For now, we'll extract the first candidate if available
+                "ip": first["ip"] if first else None,
+                "port": first["port"] if first else None,
             }
-        )
+        }
 
-        return iq
+    async def release_forwarder(self, conference_id: str, endpoint_id: str) -> None:
+        """Release an endpoint from JVB."""
+        if not self.bridge_jid:
+            self.logger("No bridge JID available for release")
+            return
+        try:
+            iq = self.make_iq_set(ito=self.bridge_jid)
+            iq.append(Colibri2IQ.build_release_modify(conference_id, [endpoint_id]))
+            await iq.send()
+            self.logger(f"Released endpoint {endpoint_id} from conference {conference_id}")
+        except Exception as e:
+            self.logger(f"Failed to release endpoint: {e}")
 
+    async def release_forwarders(self, pairs: List[Tuple[str, str]]) -> None:
+        """Release several (conference_id, endpoint_id) pairs, one IQ per conference."""
+        if not self.bridge_jid:
+            self.logger("No bridge JID available for release")
+            return
+        by_conference: Dict[str, List[str]] = {}
+        for conference_id, endpoint_id in pairs:
+            by_conference.setdefault(conference_id, []).append(endpoint_id)
+        for conference_id, endpoint_ids in by_conference.items():
+            try:
+                # The payload goes straight into a slixmpp Iq, no intermediate <iq> tree
+                iq = self.make_iq_set(ito=self.bridge_jid)
+                iq.append(Colibri2IQ.build_release_modify(conference_id, endpoint_ids))
+                await iq.send()
+                self.logger(f"Released {len(endpoint_ids)} endpoints from conference {conference_id}")
+            except Exception as e:
+                self.logger(f"Failed to release endpoints: {e}")
+
+
+class XMPPBot(_LogMixin, _ColibriV1Mixin, ClientXMPP):
+    # MUC nick the bot joins conferences with; its reflected presence is ignored
+    BOT_NICK = "recorder-bot"
+    # Max rooms started/stopped at once by the *_many recording helpers
+    _ROOM_OP_CONCURRENCY = 16
+    # Seconds a debug-endpoint resolution is reused before the bridge is asked again
+    _DEBUG_CACHE_TTL = 5.0
+    # Conference PATCH bodies are sent pre-encoded; stopping is always the same empty connects list
+    _JSON_HEADERS = {"Content-Type": "application/json"}  # Default headers of the shared client
+    _STOP_RECORDING_BODY = json.dumps({"connects": []}).encode()
+    # Conference PATCH statuses worth retrying, and how many times
+    _RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    _PATCH_RETRIES = 3
+    # Error bodies from JVB can be large; only this many bytes are logged
+    _LOG_BODY_LIMIT = 2048
+    # Disco features advertised at startup. The Jingle ones tell Jicofo we support
+    # media (critical for JVB allocation to succeed); the Jibri one identifies us
+    # as a recorder, which changes Jicofo's allocation behavior
+    _DISCO_FEATURES = (
+        'urn:xmpp:jingle:1',
+        'urn:xmpp:jingle:transports:ice-udp:1',
+        'urn:xmpp:jingle:apps:rtp:1',
+        'urn:xmpp:jingle:apps:rtp:audio',
+        'urn:xmpp:jingle:apps:rtp:video',
+        'urn:xmpp:jingle:apps:dtls:0',
+        'http://jitsi.org/protocol/jibri',
+    )
 
-class XMPPBot(ClientXMPP):
     def __init__(self, settings: XMPPSettings, logger: Optional[Callable[[str], None]] = None):
         super().__init__(settings.jid, settings.password)
         self.settings = settings
         self.logger = logger or (lambda msg: None)
         self.bridge_jid: Optional[str] = None
         self.ready = asyncio.Event()  # Set when session_start fires and bridge discovered
-        # Fix: Use asyncio.Future() instead of get_event_loop().create_future()
-        # The loop will be set when the Future is created in async context
-        self.disconnected: Optional[asyncio.Future] = None
+        # Set by on_disconnected; run() returns once it is set. Kept separate from
+        # slixmpp's own `disconnected` Future, which the stream re-creates on every disconnect
+        self.session_closed = asyncio.Event()
 
         # Colibri protocol support flags (determined via XEP-0030 Service Discovery)
         self.supports_colibri_v1: bool = False
@@ -191,32 +648,67 @@ class XMPPBot(ClientXMPP):
         # WebRTC peer connections (session ID → RTCPeerConnection)
         self.peer_connections: Dict[str, RTCPeerConnection] = {}
 
-        # Conference participant tracking (room → participant_id → participant_data)
+        # Trickle ICE candidate batches (pc, [RTCIceCandidate]) waiting for _drain_ice_candidates
+        self._cand_queue: asyncio.Queue = asyncio.Queue()
+        self._cand_task: Optional[asyncio.Task] = None
+
+        # Conference participant tracking (room → participant_id → Participant)
         # Structure: {
         #   "room-name@muc.meet.jitsi": {
-        #     "participant-jid": {
-        #       "jid": "room@conference/fullJID",
-        #       "display_name": "John Doe",
-        #       "stats_id": "abc123",
-        #       "audio_muted": false,
-        #       "video_muted": false,
-        #       "joined_at": "2024-11-20T12:00:00Z",
-        #       "ssrcs": {"audio": 12345, "video": 67890}
-        #     }
+        #     "participant-jid": Participant(
+        #       jid="room@conference/fullJID",
+        #       display_name="John Doe",
+        #       stats_id="abc123",
+        #       audio_muted=False,
+        #       video_muted=False,
+        #       joined_at=1732104000.0,
+        #       ssrcs={"audio": 12345, "video": 67890}
+        #     )
         #   }
         # }
-        self.conference_participants: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # defaultdict: joins assign in one step; readers use `in`/.get() so lookups don't create rooms
+        self.conference_participants: DefaultDict[str, Dict[str, Participant]] = defaultdict(dict)
+        # Recording-ready subset (room → participant_id → FFmpeg input dict), maintained
+        # on forwarder allocation and leave so get_participants_with_forwarders doesn't filter
+        self._ready_participants: DefaultDict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
 
         # Map MUC room names to Colibri conference IDs (Bridge Session IDs)
         # This is required because JVB expects the UUID, not the MUC name
         self.conference_ids: Dict[str, str] = {}
+        # Set once a conference ID is known for a key, so waiters wake without polling
+        self.conference_id_events: Dict[str, asyncio.Event] = defaultdict(asyncio.Event)
 
         # JVB REST API configuration for multitrack recording
         self.jvb_rest_url = os.getenv("JVB_REST_URL", "http://jvb:8080")
+        # Full tracebacks are only formatted when XMPP_DEBUG is set
+        self.debug = os.getenv("XMPP_DEBUG", "0").lower() in ("1", "true", "yes")
         self.recorder_ws_url = os.getenv("RECORDER_WS_URL", "ws://recorder:8989/record")
+        # Conference MUC JIDs are "<room>@muc.<domain>"; memoized per room by room_to_muc()
+        self._muc_suffix = f"@muc.{settings.domain}"
+        self._muc_for: Dict[str, str] = {}
+
+        # Shared keep-alive client for JVB REST calls; created in run(), closed when it returns
+        self._http: Optional[httpx.AsyncClient] = None
+        # Recent debug-endpoint resolutions: room name -> (time.monotonic() stamp, conference ID)
+        self._debug_cache: Dict[str, Tuple[float, str]] = {}
+        # The debug fetch currently in flight, awaited by every concurrent resolver
+        self._debug_inflight: Optional[asyncio.Future] = None
+        # Encoded start-recording PATCH body per room (it only depends on the room name)
+        self._start_bodies: Dict[str, bytes] = {}
+        # Recorder WebSocket URL per room (see _recorder_url)
+        self._recorder_urls: Dict[str, str] = {}
+        # Rooms with a recording started by us and not yet stopped
+        self._started_rooms: set = set()
+        # (event name, handler) pairs per conference MUC with tracking handlers registered,
+        # kept so leave_conference_muc() can remove exactly those handlers
+        self._room_events: Dict[str, Tuple[Tuple[str, Callable], ...]] = {}
 
         # Phase 3: Callback system for participant changes (join/leave)
-        self.participant_change_callbacks: List[Callable] = []
+        # Immutable (callback, is_coroutine) snapshot; rebuilt on registration, never mutated mid-dispatch
+        self.participant_change_callbacks: Tuple[Tuple[Callable, bool], ...] = ()
+        # (room, action, participant_id) events, delivered by one consumer task started in run()
+        self._pc_queue: asyncio.Queue = asyncio.Queue()
+        self._pc_task: Optional[asyncio.Task] = None
 
         # Enable slixmpp XML stream logging for debugging
         # This will show all SEND/RECV stanzas including MUC join presence
@@ -236,19 +728,12 @@ class XMPPBot(ClientXMPP):
         self.register_plugin('xep_0030')  # Service Discovery
         self.register_plugin('xep_0045')  # MUC
         self.register_plugin('xep_0199')  # XMPP Ping
+        self.register_plugin('xep_0198')  # Stream Management (resume instead of full re-login)
         
-        # Register Jingle features so Jicofo knows we support media
-        # This is critical for JVB allocation to succeed
-        self['xep_0030'].add_feature('urn:xmpp:jingle:1')
-        self['xep_0030'].add_feature('urn:xmpp:jingle:transports:ice-udp:1')
-        self['xep_0030'].add_feature('urn:xmpp:jingle:apps:rtp:1')
-        self['xep_0030'].add_feature('urn:xmpp:jingle:apps:rtp:audio')
-        self['xep_0030'].add_feature('urn:xmpp:jingle:apps:rtp:video')
-        self['xep_0030'].add_feature('urn:xmpp:jingle:apps:dtls:0')
-        
-        # Register Jibri feature to identify as a recorder
-        # This tells Jicofo we are a Jibri, which changes allocation behavior
-        self['xep_0030'].add_feature('http://jitsi.org/protocol/jibri')
+        # Register Jingle + Jibri features (see _DISCO_FEATURES)
+        disco = self['xep_0030']
+        for feature in self._DISCO_FEATURES:
+            disco.add_feature(feature)
         
         # Note: xep_0166 (Jingle) not available in Slixmpp 1.8.4
         # Using raw handler instead (see register_handler below)
@@ -291,6 +776,11 @@ class XMPPBot(ClientXMPP):
         self.logger(f"Client JID: {self.boundjid}")
         self.send_presence()
         self.logger("Sent presence")
+
+        # Start the ICE candidate consumer once (session_start fires again on reconnect)
+        if self._cand_task is None or self._cand_task.done():
+            self._cand_task = asyncio.create_task(self._drain_ice_candidates())
+
         await self.get_roster()
         self.logger("Got roster")
 
@@ -319,25 +809,23 @@ class XMPPBot(ClientXMPP):
                 raise
 
         except Exception as e:
-            self.logger(f"Failed to join bridge MUC: {e}")
-            import traceback
-            self.logger(f"Traceback: {traceback.format_exc()}")
+            self._log_exception("Failed to join bridge MUC", e)
             # Don't set ready on error
             raise
 
     def on_disconnected(self, event=None):
         """Called when XMPP connection is lost"""
         self.logger("XMPP disconnected")
-        if self.disconnected and not self.disconnected.done():
-            self.disconnected.set_result(True)
+        self.session_closed.set()
 
     def muc_online(self, presence):
         """Called when a MUC occupant comes online"""
         occupant = presence["muc"]["jid"]
         # JVB typically appears as jvb@auth.meet.jitsi or jvb@internal...
         # Look for jvb in the username part of the JID
-        if occupant and occupant.bare and occupant.bare.startswith("jvb@"):
-            self.bridge_jid = occupant.bare
+        bare = occupant.bare if occupant else None
+        if bare and bare.startswith(_JVB_PREFIX):
+            self.bridge_jid = bare
             self.logger(f"Discovered bridge JID: {self.bridge_jid}")
             
             # Log the full presence stanza to inspect for conference IDs
@@ -384,15 +872,22 @@ class XMPPBot(ClientXMPP):
             # Send Disco#info query using XEP-0030
             info = await self['xep_0030'].get_info(jid=self.bridge_jid, timeout=5)
 
-            # Extract all supported features
-            features = info['disco_info']['features']
-            self.logger(f"📋 JVB ADVERTISED FEATURES ({len(features)} total):")
-            for feature in sorted(features):
-                self.logger(f"   - {feature}")
-
-            # Check specifically for Colibri protocol versions
-            has_colibri_v1 = 'http://jitsi.org/protocol/colibri' in features
-            has_colibri_v2 = 'urn:xmpp:jitsi-videobridge:colibri2' in features
+            # The full feature list is only collected when it will be logged
+            if self.log_level <= logging.DEBUG:
+                features = frozenset(info['disco_info']['features'])
+                self._log(logging.DEBUG, "📋 JVB ADVERTISED FEATURES (%d total): %s", len(features), features)
+
+            # Check specifically for Colibri protocol versions, stopping the
+            # scan of the raw <feature> elements as soon as both are seen
+            has_colibri_v1 = has_colibri_v2 = False
+            for feature_elem in info.xml.iter(NS_DISCO_FEATURE):
+                var = feature_elem.get('var')
+                if var == 'http://jitsi.org/protocol/colibri':
+                    has_colibri_v1 = True
+                elif var == 'urn:xmpp:jitsi-videobridge:colibri2':
+                    has_colibri_v2 = True
+                if has_colibri_v1 and has_colibri_v2:
+                    break
 
             self.logger("")
             self.logger("=" * 70)
@@ -417,9 +912,7 @@ class XMPPBot(ClientXMPP):
         except asyncio.TimeoutError:
             self.logger("❌ Capability probe timed out (JVB not responding to disco#info)")
         except Exception as e:
-            self.logger(f"❌ Capability probe failed: {e}")
-            import traceback
-            self.logger(f"Traceback: {traceback.format_exc()}")
+            self._log_exception("❌ Capability probe failed", e)
 
     def _handle_jingle_session_initiate(self, iq):
         """
@@ -439,24 +932,25 @@ class XMPPBot(ClientXMPP):
 
         try:
             # Extract Jingle element
-            jingle = iq.xml.find('{urn:xmpp:jingle:1}jingle')
+            jingle = iq.xml.find(NS_JINGLE)
             if jingle is None:
                 self.logger("❌ No jingle element found in IQ")
                 return
 
             # DEBUG: Log raw Jingle XML to debug missing Bridge Session ID
-            import xml.etree.ElementTree as ET
-            raw_xml = ET.tostring(jingle, encoding='unicode')
-            self.logger(f"📜 Raw Jingle XML: {raw_xml[:500]}...") # Log first 500 chars
+            # Serializing the whole offer (many KB with sources) is only worth it when debugging
+            if self.debug:
+                raw_xml = ET.tostring(jingle, encoding='unicode')
+                self.logger(f"📜 Raw Jingle XML: {raw_xml[:500]}...") # Log first 500 chars
 
             sid = jingle.get('sid')
             initiator = jingle.get('initiator')
-            self.logger(f"Session ID: {sid}")
-            self.logger(f"Initiator: {initiator}")
+            self._log(logging.INFO, "Session ID: %s", sid)
+            self._log(logging.INFO, "Initiator: %s", initiator)
 
             # Extract Bridge Session ID (Colibri Conference ID)
             # Namespace: http://jitsi.org/protocol/focus
-            bridge_session = jingle.find('{http://jitsi.org/protocol/focus}bridge-session')
+            bridge_session = jingle.find(NS_FOCUS_BRIDGE_SESSION)
             if bridge_session is not None:
                 bs_id = bridge_session.get('id')
                 if bs_id:
@@ -466,12 +960,12 @@ class XMPPBot(ClientXMPP):
                     iq_from = str(iq['from'])
                     if '@muc.' in iq_from:
                         room_name = iq_from.split('/')[0]
-                        self.conference_ids[room_name] = bs_id
+                        self._set_conference_id(room_name, bs_id)
                         
                         # Also store short name mapping for API lookups
                         if "@" in room_name:
-                            short_name = room_name.split("@")[0]
-                            self.conference_ids[short_name] = bs_id
+                            short_name = self._short(room_name)
+                            self._set_conference_id(short_name, bs_id)
                             self.logger(f"   Mapped room {short_name} -> {bs_id}")
                             
                         self.logger(f"   Mapped room {room_name} -> {bs_id}")
@@ -481,9 +975,10 @@ class XMPPBot(ClientXMPP):
             # Extract SSRCs from Jingle offer (Phase 1.2: SSRC Discovery)
             ssrcs = extract_ssrcs_from_jingle(jingle)
             if ssrcs:
-                self.logger(f"📊 Extracted SSRCs from {initiator}:")
+                self._log(logging.INFO, "📊 Extracted SSRCs from %s:", initiator)
                 for media_type, ssrc_info in ssrcs.items():
-                    self.logger(f"   {media_type}: SSRC={ssrc_info['ssrc']}, cname={ssrc_info.get('cname', 'N/A')}")
+                    self._log(logging.DEBUG, "   %s: SSRC=%s, cname=%s",
+                              media_type, ssrc_info['ssrc'], ssrc_info.get('cname', 'N/A'))
                 
                 # Map SSRC to participant in conference tracking
                 # NOTE: In Jitsi, Jicofo (focus) sends Jingle offers on behalf of participants
@@ -493,26 +988,28 @@ class XMPPBot(ClientXMPP):
                 # Extract the room name from initiator MUC JID
                 # initiator format: "testroom@muc.meet.jitsi/7ab5d390"
                 if '@muc.' in initiator:
-                    room_from_init = initiator.split('/')[0]  # "testroom@muc.meet.jitsi"
+                    # Interned like the room_to_muc() keys of conference_participants,
+                    # so the lookups below hit the identity fast path
+                    room_from_init = sys.intern(initiator.partition('/')[0])  # "testroom@muc.meet.jitsi"
                     
                     if room_from_init in self.conference_participants:
                         participants = self.conference_participants[room_from_init]
                         
                         # Heuristic: Assign SSRCs to most recently joined participant without SSRCs
                         # This works because Jicofo sends session-initiate shortly after participant joins
-                        self.logger(f"   Checking {len(participants)} participants for SSRC mapping...")
-                        for jid in reversed(list(participants.keys())):
-                            participant = participants[jid]
-                            self.logger(f"   - Checking {jid} (ssrcs={bool(participant.get('ssrcs'))})")
+                        self._log(logging.DEBUG, "   Checking %d participants for SSRC mapping...", len(participants))
+                        # reversed() over the items view: no key list copy, no second lookup per JID
+                        for jid, participant in reversed(participants.items()):
+                            self._log(logging.DEBUG, "   - Checking %s (ssrcs=%s)", jid, bool(participant.ssrcs))
                             
                             # Skip if this participant already has SSRCs or is focus/jibri
-                            if participant.get('ssrcs') or 'focus' in jid or 'jibri' in jid or jid == 'recorder-bot':
-                                self.logger(f"     Skipping {jid}")
+                            if participant.ssrcs or 'focus' in jid or 'jibri' in jid or jid == self.BOT_NICK:
+                                self._log(logging.DEBUG, "     Skipping %s", jid)
                                 continue
                             
                             # Assign SSRCs to this participant
-                            participant['ssrcs'] = ssrcs
-                            nick = participant.get('nick', jid)
+                            participant.ssrcs = ssrcs
+                            nick = participant.nick or jid
                             self.logger(f"✅ Mapped SSRCs to participant {nick} (JID: {jid}) in room {room_from_init}")
                             participant_updated = True
                             
@@ -534,21 +1031,31 @@ class XMPPBot(ClientXMPP):
             # Convert Jingle XML to SDP offer
             sdp_offer = jingle_to_sdp(jingle)
 
-            self.logger(f"📄 Converted SDP offer:\n{sdp_offer}")
+            self._log(logging.DEBUG, "📄 Converted SDP offer:\n%s", sdp_offer)
+
+            # A retransmitted session-initiate must not leak the previous connection
+            # (its ICE agent, DTLS transport and sockets would otherwise stay alive)
+            old_pc = self.peer_connections.pop(sid, None)
+            if old_pc is not None:
+                self._log(logging.WARNING, "♻️  Replacing existing peer connection for session %s", sid)
+                await old_pc.close()
 
             # Create RTCPeerConnection
             pc = RTCPeerConnection()
             self.peer_connections[sid] = pc
 
+            # One sink for every track of this connection; start() only spawns
+            # consumers for tracks it hasn't seen, and stop() drops them all at once
+            blackhole = MediaBlackhole()
+
             # Track handler - log received tracks and consume them
             @pc.on("track")
             async def on_track(track):
-                self.logger(f"🎵 Received {track.kind} track from {initiator}")
-                self.logger(f"   Track ID: {track.id}")
+                self._log(logging.INFO, "🎵 Received %s track from %s", track.kind, initiator)
+                self._log(logging.DEBUG, "   Track ID: %s", track.id)
 
                 # For Phase 2, just consume the track (prevent buffer overflow)
                 # Phase 3 will pipe to FFmpeg
-                blackhole = MediaBlackhole()
                 blackhole.addTrack(track)
                 await blackhole.start()
 
@@ -556,11 +1063,22 @@ class XMPPBot(ClientXMPP):
             @pc.on("connectionstatechange")
             async def on_connectionstatechange():
                 self.logger(f"🔌 ICE connection state: {pc.connectionState}")
+                if pc.connectionState in ("failed", "closed"):
+                    await blackhole.stop()
                 if pc.connectionState == "failed":
                     self.logger("❌ ICE connection failed")
                 elif pc.connectionState == "connected":
                     self.logger("✅ ICE connection established!")
 
+            # Resolved by aiortc's gathering-state event (registered before
+            # setLocalDescription, which is what starts gathering)
+            gather_done = asyncio.get_running_loop().create_future()
+
+            @pc.on("icegatheringstatechange")
+            def on_icegatheringstatechange():
+                if pc.iceGatheringState == "complete" and not gather_done.done():
+                    gather_done.set_result(None)
+
             # Set remote description (offer)
             await pc.setRemoteDescription(RTCSessionDescription(sdp=sdp_offer, type="offer"))
             self.logger("✅ Set remote description (offer)")
@@ -573,13 +1091,12 @@ class XMPPBot(ClientXMPP):
             # Wait for ICE gathering to complete (so we send candidates in session-accept)
             # This avoids the need for complex Trickle ICE implementation for now
             self.logger("⏳ Waiting for ICE gathering to complete...")
-            gather_start = asyncio.get_event_loop().time()
-            while pc.iceGatheringState != "complete":
-                if asyncio.get_event_loop().time() - gather_start > 5.0:
+            if pc.iceGatheringState != "complete":
+                try:
+                    await asyncio.wait_for(gather_done, timeout=5.0)
+                except asyncio.TimeoutError:
                     self.logger("⚠️ ICE gathering timed out (5s), proceeding with what we have")
-                    break
-                await asyncio.sleep(0.1)
-            self.logger(f"✅ ICE gathering complete (State: {pc.iceGatheringState})")
+            self._log(logging.INFO, "✅ ICE gathering complete (State: %s)", pc.iceGatheringState)
 
             # Convert SDP answer to Jingle session-accept XML
             jingle_accept = sdp_to_jingle_accept(
@@ -600,24 +1117,18 @@ class XMPPBot(ClientXMPP):
             self.logger("✅ Sent session-accept! WebRTC negotiation complete.")
 
         except Exception as e:
-            self.logger(f"❌ Error handling Jingle session-initiate: {e}")
-            import traceback
-            self.logger(f"Traceback: {traceback.format_exc()}")
+            self._log_exception("❌ Error handling Jingle session-initiate", e)
 
     def _handle_jingle_transport_info(self, iq):
         """
         Handler for incoming Jingle transport-info IQ (trickle ICE candidates).
-        """
-        # Schedule async handler
-        asyncio.create_task(self._handle_jingle_transport_info_async(iq))
 
-    async def _handle_jingle_transport_info_async(self, iq):
-        """
-        Async handler for Jingle transport-info. Adds ICE candidates to peer connection.
+        Parsing needs no await, so candidates are parsed here and queued for the
+        `_drain_ice_candidates` consumer instead of spawning a Task per IQ.
         """
         try:
             # Extract Jingle element
-            jingle = iq.xml.find('{urn:xmpp:jingle:1}jingle')
+            jingle = iq.xml.find(NS_JINGLE)
             if jingle is None:
                 self.logger("❌ No jingle element in transport-info")
                 return
@@ -630,78 +1141,98 @@ class XMPPBot(ClientXMPP):
             pc = self.peer_connections[sid]
 
             # Extract ICE candidates from all content/transport elements
-            contents = jingle.findall('{urn:xmpp:jingle:1}content')
+            log_candidates = self.log_level <= logging.DEBUG
             candidate_count = 0
-            added_count = 0
+            ice_candidates = []
 
-            for content in contents:
+            # Stream the <content> children instead of materializing a findall() list;
+            # stdlib elements have no getparent(), so the mid comes from this outer loop
+            for content in jingle.iterfind(NS_JINGLE_CONTENT):
                 mid = content.get('name')  # Media stream ID (e.g., "0" for audio, "1" for video)
 
-                transport = content.find('{urn:xmpp:jingle:transports:ice-udp:1}transport')
-                if transport is None:
-                    continue
-
-                candidates = transport.findall('{urn:xmpp:jingle:transports:ice-udp:1}candidate')
-                for cand_elem in candidates:
-                    # Extract candidate attributes
-                    foundation = cand_elem.get('foundation', '0')
-                    component = cand_elem.get('component', '1')
-                    protocol = cand_elem.get('protocol', 'udp')
-                    priority = cand_elem.get('priority', '0')
-                    ip = cand_elem.get('ip')
-                    port = cand_elem.get('port')
-                    typ = cand_elem.get('type', 'host')
-                    rel_addr = cand_elem.get('rel-addr')
-                    rel_port = cand_elem.get('rel-port')
+                # iter(tag) filters in C and skips the separate <transport> lookup + list build
+                for cand_elem in content.iter(NS_ICE_CAND):
+                    # Extract candidate attributes (plain dict lookups on the attrib mapping)
+                    attrs = cand_elem.attrib
+                    foundation = attrs.get('foundation', '0')
+                    component = attrs.get('component', '1')
+                    protocol = attrs.get('protocol', 'udp')
+                    priority = attrs.get('priority', '0')
+                    ip = attrs.get('ip')
+                    port = _int_or(attrs.get('port'))
+                    typ = attrs.get('type', 'host')
+                    rel_addr = attrs.get('rel-addr')
+                    rel_port = attrs.get('rel-port')
 
                     if not ip or not port:
                         continue
 
                     candidate_count += 1
 
-                    # Build ICE candidate string for logging
-                    candidate_str = f"candidate:{foundation} {component} {protocol} {priority} {ip} {port} typ {typ}"
-                    if rel_addr and rel_port:
-                        candidate_str += f" raddr {rel_addr} rport {rel_port}"
-
-                    self.logger(f"🧊 ICE candidate [{mid}]: {candidate_str}")
+                    # Build ICE candidate string for logging (debug only: one line per candidate)
+                    if log_candidates:
+                        candidate_str = f"candidate:{foundation} {component} {protocol} {priority} {ip} {port} typ {typ}"
+                        if rel_addr and rel_port:
+                            candidate_str += f" raddr {rel_addr} rport {rel_port}"
+                        self._log(logging.DEBUG, "🧊 ICE candidate [%s]: %s", mid, candidate_str)
 
                     try:
                         # Create RTCIceCandidate object
                         ice_candidate = RTCIceCandidate(
-                            component=int(component),
+                            component=_int_or(component, 1),
                             foundation=foundation,
                             ip=ip,
-                            port=int(port),
-                            priority=int(priority),
+                            port=port,
+                            priority=_int_or(priority),
                             protocol=protocol,
                             type=typ,
                             relatedAddress=rel_addr if rel_addr else None,
-                            relatedPort=int(rel_port) if rel_port else None,
+                            relatedPort=_int_or(rel_port, None),
                             sdpMid=mid,
-                            sdpMLineIndex=int(mid) if mid and mid.isdigit() else None
+                            sdpMLineIndex=_int_or(mid, None)
                         )
+                    except Exception as e:
+                        self.logger(f"⚠️  Failed to parse ICE candidate: {e}")
+                        continue
 
-                        # Add candidate to peer connection
-                        await pc.addIceCandidate(ice_candidate)
-                        added_count += 1
-                        self.logger(f"✅ Added ICE candidate to peer connection")
+                    ice_candidates.append(ice_candidate)
 
-                    except Exception as e:
-                        self.logger(f"⚠️  Failed to add ICE candidate: {e}")
+            if ice_candidates:
+                # Hand the whole batch to the consumer task which awaits pc.addIceCandidate
+                self._cand_queue.put_nowait((pc, ice_candidates))
 
             if candidate_count > 0:
-                self.logger(f"📥 Received {candidate_count} ICE candidates, added {added_count} to session {sid}")
+                self._log(logging.INFO, "📥 Received %d ICE candidates, queued %d for session %s",
+                          candidate_count, len(ice_candidates), sid)
 
             # Send IQ result to acknowledge
             response_iq = self.make_iq_result(iq['id'])
             response_iq['to'] = iq['from']
-            await response_iq.send()
+            response_iq.send()
 
         except Exception as e:
-            self.logger(f"❌ Error handling transport-info: {e}")
-            import traceback
-            self.logger(f"Traceback: {traceback.format_exc()}")
+            self._log_exception("❌ Error handling transport-info", e)
+
+    async def _drain_ice_candidates(self):
+        """
+        Single long-running consumer for candidate batches queued by `_handle_jingle_transport_info`.
+        Started once per session in `on_session_start`.
+        """
+        while True:
+            # Take every batch queued so far, not just one IQ's worth, so a burst of
+            # transport-info IQs is added in one gather instead of one loop turn per IQ
+            batches = [await self._cand_queue.get()]
+            while not self._cand_queue.empty():
+                batches.append(self._cand_queue.get_nowait())
+            results = await asyncio.gather(
+                *(pc.addIceCandidate(c) for pc, ice_candidates in batches for c in ice_candidates),
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    self._log(logging.WARNING, "⚠️  Failed to add ICE candidate: %s", result)
+                else:
+                    self._log(logging.DEBUG, "✅ Added ICE candidate to peer connection")
 
     def _handle_colibri2_conference_modify(self, iq):
         """
@@ -720,32 +1251,32 @@ class XMPPBot(ClientXMPP):
           </conference-modify>
         </iq>
         """
-        self.logger(f"Received Colibri2 conference-modify from {iq['from']}")
+        self._log(logging.DEBUG, "Received Colibri2 conference-modify from %s", iq['from'])
         
         try:
             # Extract conference ID and room name for multitrack recording mapping
-            conf_modify = iq.xml.find('{urn:xmpp:jitsi-videobridge:colibri2}conference-modify')
+            conf_modify = iq.xml.find(NS_COLIBRI_CONF_MODIFY)
             if conf_modify is not None:
                 meeting_id = conf_modify.get('meeting-id')
                 room_name = conf_modify.get('name')
                 
                 if meeting_id and room_name:
                     # Store the mapping: room JID -> conference ID
-                    self.conference_ids[room_name] = meeting_id
-                    self.logger(f"🔗 Mapped conference: {room_name} -> {meeting_id}")
+                    self._set_conference_id(room_name, meeting_id)
+                    self._log(logging.INFO, "🔗 Mapped conference: %s -> %s", room_name, meeting_id)
                 else:
-                    self.logger(f"⚠️  Colibri2 message missing meeting-id or name attributes")
+                    self._log(logging.WARNING, "⚠️  Colibri2 message missing meeting-id or name attributes")
             else:
-                self.logger(f"⚠️  No conference-modify element found in Colibri2 IQ")
+                self._log(logging.WARNING, "⚠️  No conference-modify element found in Colibri2 IQ")
                 
         except Exception as e:
-            self.logger(f"⚠️  Error extracting conference ID from Colibri2 message: {e}")
-            import traceback
-            self.logger(f"Traceback: {traceback.format_exc()}")
+            self._log_exception("⚠️  Error extracting conference ID from Colibri2 message", e)
         
-        # Send result IQ to acknowledge (prevents Jicofo timeout)
-        iq.reply().send()
-        self.logger("✅ Sent Colibri2 acknowledgement")
+        # Send result IQ to acknowledge (prevents Jicofo timeout). A fresh empty
+        # result rather than iq.reply(), which deep-copies the whole request first;
+        # sending a result IQ doesn't wait for anything
+        self.make_iq_result(iq['id'], ito=iq['from']).send()
+        self._log(logging.DEBUG, "✅ Sent Colibri2 acknowledgement")
 
     async def join_conference_muc(self, room: str):
         """
@@ -755,8 +1286,8 @@ class XMPPBot(ClientXMPP):
         Args:
             room: Conference room name (e.g., "test-conference")
         """
-        conference_muc = f"{room}@muc.{self.settings.domain}"
-        nick = "recorder-bot"
+        conference_muc = self.room_to_muc(room)
+        nick = self.BOT_NICK
 
         self.logger(f"🚪 Joining conference MUC: {conference_muc} as {nick}")
 
@@ -778,8 +1309,7 @@ class XMPPBot(ClientXMPP):
                 break # Success!
             except Exception as e: # Catch any other potential errors during join initiation
                 self.logger(f"❌ Error initiating MUC join for {conference_muc}: {e}")
-                import traceback
-                self.logger(f"Traceback: {traceback.format_exc()}")
+                self._log_traceback()
                 if attempt < max_retries - 1:
                     self.logger("Retrying join in 5 seconds...")
                     await asyncio.sleep(5.0)
@@ -788,9 +1318,7 @@ class XMPPBot(ClientXMPP):
                     # Wait a bit longer to give the join more time to actually complete
                     await asyncio.sleep(5.0)
             except Exception as e:
-                self.logger(f"❌ Error joining conference MUC: {e}")
-                import traceback
-                self.logger(f"Traceback: {traceback.format_exc()}")
+                self._log_exception("❌ Error joining conference MUC", e)
                 raise
 
         # Always send custom muted presence and register handlers
@@ -803,11 +1331,11 @@ class XMPPBot(ClientXMPP):
             
             # Add Jitsi-specific status elements to indicate muted state
             # This should prevent Jicofo from trying to allocate bridge resources
-            audiomuted = ET.Element('{http://jitsi.org/jitmeet/audio}audiomuted')
+            audiomuted = ET.Element(NS_JITSI_AUDIO)
             audiomuted.text = 'true'
             presence.append(audiomuted)
             
-            videomuted = ET.Element('{http://jitsi.org/jitmeet/video}videomuted')
+            videomuted = ET.Element(NS_JITSI_VIDEO)
             videomuted.text = 'true'
             presence.append(videomuted)
             
@@ -817,15 +1345,19 @@ class XMPPBot(ClientXMPP):
             
             # Register MUC presence handlers for this conference room
             # This allows us to track participants joining/leaving
-            self.add_event_handler(
-                f"muc::{conference_muc}::got_online",
-                lambda pres: self._on_conference_participant_online(conference_muc, pres)
-            )
-            self.add_event_handler(
-                f"muc::{conference_muc}::got_offline",
-                lambda pres: self._on_conference_participant_offline(conference_muc, pres)
-            )
-            self.logger(f"✅ Registered participant tracking handlers for {conference_muc}")
+            # Only once per room: re-joining must not stack a second set of handlers
+            if conference_muc not in self._room_events:
+                # functools.partial binds the room without an extra Python frame per presence
+                room_events = (
+                    (f"muc::{conference_muc}::got_online",
+                     functools.partial(self._on_conference_participant_online, conference_muc)),
+                    (f"muc::{conference_muc}::got_offline",
+                     functools.partial(self._on_conference_participant_offline, conference_muc)),
+                )
+                self._room_events[conference_muc] = room_events
+                for event, handler in room_events:
+                    self.add_event_handler(event, handler)
+                self.logger(f"✅ Registered participant tracking handlers for {conference_muc}")
             
             # Track existing participants in the room
             await asyncio.sleep(0.5)  # Brief wait for roster to populate
@@ -840,11 +1372,27 @@ class XMPPBot(ClientXMPP):
                     # No need to manually track them here
 
         except Exception as e:
-            self.logger(f"❌ Error setting up participant tracking: {e}")
-            import traceback
-            self.logger(f"Traceback: {traceback.format_exc()}")
+            self._log_exception("❌ Error setting up participant tracking", e)
+
+    @staticmethod
+    def _short(name: str) -> str:
+        """Short room name: the part before '@' ("room@muc.meet.jitsi" -> "room"), or the name itself."""
+        return name.partition("@")[0]
+
+    def room_to_muc(self, room: str) -> str:
+        """
+        Full conference MUC JID for a room (e.g. "my-meeting" -> "my-meeting@muc.meet.jitsi"),
+        memoized per room. Names that already contain a domain are returned unchanged.
+
+        Args:
+            room: Conference room name or full MUC JID
+        """
+        muc = self._muc_for.get(room)
+        if muc is None:
+            muc = self._muc_for[room] = sys.intern(room if "@" in room else room + self._muc_suffix)
+        return muc
 
-    def _parse_participant_from_presence(self, presence) -> Dict[str, Any]:
+    def _parse_participant_from_presence(self, presence) -> Participant:
         """
         Parse participant metadata from MUC presence stanza.
         
@@ -858,57 +1406,61 @@ class XMPPBot(ClientXMPP):
             presence: slixmpp presence stanza
             
         Returns:
-            Dictionary with participant metadata
+            Participant with metadata from the presence
         """
-        from datetime import datetime
-        
-        participant_data = {
-            "jid": str(presence['from']),
-            "display_name": None,
-            "stats_id": None,
-            "audio_muted": False,
-            "video_muted": False,
-            "joined_at": datetime.utcnow().isoformat() + "Z",
-            "ssrcs": {}
-        }
+        participant_data = Participant(
+            jid=str(presence['from']),
+            joined_at=time.time(),
+        )
         
         
+        # One pass over the presence children instead of a find() scan per extension
+        # (a find() returns the first match, hence the `is None` guards)
+        stats_id = audio_muted = video_muted = None
+        for child in presence.xml:
+            tag = child.tag
+            if tag == NS_STATS_ID:
+                if stats_id is None:
+                    stats_id = child
+            elif tag == NS_JITSI_AUDIO:
+                if audio_muted is None:
+                    audio_muted = child
+            elif tag == NS_JITSI_VIDEO:
+                if video_muted is None:
+                    video_muted = child
+
         # Extract stats-id from Jitsi extension
-        stats_elem = presence.xml.find('{http://jitsi.org/jitmeet}stats-id')
-        if stats_elem is not None and stats_elem.text:
-            participant_data["stats_id"] = stats_elem.text
-        
+        if stats_id is not None and stats_id.text:
+            participant_data.stats_id = stats_id.text
+
         # Extract muted status from Jitsi extensions
-        audio_muted = presence.xml.find('{http://jitsi.org/jitmeet/audio}audiomuted')
         if audio_muted is not None and audio_muted.text:
-            participant_data["audio_muted"] = audio_muted.text.lower() == 'true'
-        
-        video_muted = presence.xml.find('{http://jitsi.org/jitmeet/video}videomuted')
+            participant_data.audio_muted = audio_muted.text.lower() == 'true'
+
         if video_muted is not None and video_muted.text:
-            participant_data["video_muted"] = video_muted.text.lower() == 'true'
+            participant_data.video_muted = video_muted.text.lower() == 'true'
         
         return participant_data
 
-    def _track_participant_join(self, room: str, participant_id: str, participant_data: Dict[str, Any]):
+    def _track_participant_join(self, room: str, participant_id: str, participant_data: Participant):
         """
         Track a participant joining a conference room.
         
         Args:
             room: Full MUC JID (e.g., "room-name@muc.meet.jitsi")
             participant_id: Participant nick or unique identifier
-            participant_data: Metadata dict from _parse_participant_from_presence
+            participant_data: Participant from _parse_participant_from_presence
         """
-        if room not in self.conference_participants:
-            self.conference_participants[room] = {}
-        
         self.conference_participants[room][participant_id] = participant_data
-        
-        display_name = participant_data.get("display_name", participant_id)
-        self.logger(f"👤 Participant joined [{room}]: {display_name} (ID: {participant_id})")
+        # A fresh record has no forwarder yet
+        self._ready_participants.get(room, {}).pop(participant_id, None)
         
         # Phase 3: Notify callbacks of participant join
-        asyncio.create_task(self._notify_participant_change(room, "joined", participant_id))
-        self.logger(f"   Audio muted: {participant_data['audio_muted']}, Video muted: {participant_data['video_muted']}")
+        self._pc_queue.put_nowait((room, "joined", participant_id))
+
+        self._log(logging.INFO, "👤 Participant joined [%s]: %s (ID: %s, audio muted: %s, video muted: %s)",
+                  room, participant_data.display_name or participant_id, participant_id,
+                  participant_data.audio_muted, participant_data.video_muted)
 
     def _track_participant_leave(self, room: str, participant_id: str):
         """
@@ -918,15 +1470,15 @@ class XMPPBot(ClientXMPP):
             room: Full MUC JID
             participant_id: Participant identifier
         """
-        removed_participant = None
-        if room in self.conference_participants and participant_id in self.conference_participants[room]:
-            removed_participant = self.conference_participants[room].pop(participant_id)
-            display_name = removed_participant.get("display_name", participant_id)
+        room_participants = self.conference_participants.get(room)
+        removed_participant = room_participants.pop(participant_id, None) if room_participants else None
         if removed_participant:
-            self.logger(f"👋 Participant left [{room}]: {display_name} (ID: {participant_id})")
+            self._ready_participants.get(room, {}).pop(participant_id, None)
+            self._log(logging.INFO, "👋 Participant left [%s]: %s (ID: %s)",
+                      room, removed_participant.display_name or participant_id, participant_id)
             
             # Phase 3: Notify callbacks of participant leave
-            asyncio.create_task(self._notify_participant_change(room, "left", participant_id))
+            self._pc_queue.put_nowait((room, "left", participant_id))
 
     def get_conference_participants(self, room: str) -> Dict[str, Dict[str, Any]]:
         """
@@ -938,13 +1490,14 @@ class XMPPBot(ClientXMPP):
         Returns:
             Dictionary mapping participant IDs to their metadata
         """
-        conference_muc = f"{room}@muc.{self.settings.domain}"
-        return self.conference_participants.get(conference_muc, {})
+        conference_muc = self.room_to_muc(room)
+        participants = self.conference_participants.get(conference_muc, {})
+        return {participant_id: p.to_dict() for participant_id, p in participants.items()}
 
     async def allocate_forwarder_for_participant(self, room: str, participant_jid: str) -> bool:
         """
         Allocate Colibri forwarder for a specific participant in a room (Phase 1.3).
-        Updates participant dict with forwarder info.
+        Updates the Participant with forwarder info.
         
         Returns True if successful, False otherwise.
         """
@@ -959,19 +1512,16 @@ class XMPPBot(ClientXMPP):
         participant = self.conference_participants[room][participant_jid]
         
         # Extract endpoint ID (resource part of JID)
-        endpoint_id = participant_jid.split('/')[-1] if '/' in participant_jid else participant_jid
+        endpoint_id = participant_jid.rsplit('/', 1)[-1]
         
         try:
-            import time
-            
             # Wait for Bridge Session ID to be discovered
             # This handles the race condition where Jingle offer processing (which extracts the ID)
             # happens concurrently with this allocation call.
-            for i in range(25): # Wait up to 5 seconds
-                if room in self.conference_ids:
-                    break
-                self.logger(f"⏳ Waiting for Bridge Session ID for {room} (Attempt {i+1}/25)...")
-                await asyncio.sleep(0.2)
+            if room not in self.conference_ids:
+                self.logger(f"⏳ Waiting for Bridge Session ID for {room}...")
+                if await self._wait_for_conference_id(room, timeout=5.0) is None:
+                    self.logger(f"⏳ No Bridge Session ID for {room} after 5s")
             
             # Use the correct Colibri conference ID if available, otherwise fallback to room name
             conference_id = self.conference_ids.get(room, room)
@@ -984,21 +1534,32 @@ class XMPPBot(ClientXMPP):
             forwarder_info = allocation.get('forwarder', {})
             
             # Store forwarder details in participant
-            participant['forwarder'] = {
+            fwd = participant.forwarder = {
                 'ip': forwarder_info.get('ip'),
                 'port': forwarder_info.get('port'),
                 'allocated_at': time.time(),
                 'endpoint_id': endpoint_id
             }
+
+            # Has both SSRC and forwarder - ready for recording
+            # (unless the participant left while the allocation was in flight)
+            if self.conference_participants.get(room, {}).get(participant_jid) is participant:
+                self._ready_participants[room][participant_jid] = {
+                    'id': endpoint_id,
+                    'name': participant.nick,
+                    'jid': participant_jid,
+                    'rtp_url': f"rtp://{fwd['ip']}:{fwd['port']}",
+                    'ssrc': participant.ssrcs.get('audio', {}).get('ssrc'),
+                    'forwarder': fwd
+                }
             
-            self.logger(f"✅ Allocated forwarder for {participant.get('nick', participant_jid)}: "
+            self.logger(f"✅ Allocated forwarder for {participant.nick or participant_jid}: "
                        f"{forwarder_info.get('ip')}:{forwarder_info.get('port')}")
             return True
             
         except Exception as e:
             self.logger(f"❌ Failed to allocate forwarder for {participant_jid}: {e}")
-            import traceback
-            self.logger(f"Traceback: {traceback.format_exc()}")
+            self._log_traceback()
             return False
 
     def get_participants_with_forwarders(self, room: str) -> List[Dict[str, Any]]:
@@ -1006,26 +1567,25 @@ class XMPPBot(ClientXMPP):
         Get all participants in room who have forwarders allocated (Phase 1.3).
         Returns list suitable for FFmpeg command building.
         """
-        if room not in self.conference_participants:
-            return []
-            
-        result = []
-        for jid, participant in self.conference_participants[room].items():
-            if 'forwarder' in participant and 'ssrcs' in participant:
-                # Has both SSRC and forwarder - ready for recording
-                fwd = participant['forwarder']
-                ssrc_audio = participant['ssrcs'].get('audio', {})
-                
-                result.append({
-                    'id': fwd.get('endpoint_id', jid.split('/')[-1]),
-                    'name': participant.get('nick', ''),
-                    'jid': jid,
-                    'rtp_url': f"rtp://{fwd['ip']}:{fwd['port']}",
-                    'ssrc': ssrc_audio.get('ssrc'),
-                    'forwarder': fwd
-                })
-        
-        return result
+        return list(self._ready_participants.get(room, {}).values())
+
+    async def leave_conference_muc(self, room: str):
+        """
+        Leave a conference MUC joined by `join_conference_muc` and drop its participant tracking.
+
+        Args:
+            room: Conference room name (e.g., "test-conference") or full MUC JID
+        """
+        conference_muc = self.room_to_muc(room)
+        muc = self.plugin["xep_0045"]
+        # leave_muc() raises KeyError for rooms the plugin never joined
+        if conference_muc in muc.rooms:
+            muc.leave_muc(conference_muc, self.BOT_NICK)
+        for event, handler in self._room_events.pop(conference_muc, ()):
+            self.del_event_handler(event, handler)
+        self.conference_participants.pop(conference_muc, None)
+        self._ready_participants.pop(conference_muc, None)
+        self._log(logging.INFO, "🚪 Left conference MUC: %s", conference_muc)
 
     def is_in_conference(self, room: str) -> bool:
         """
@@ -1037,7 +1597,7 @@ class XMPPBot(ClientXMPP):
         Returns:
             True if bot is in the conference, False otherwise
         """
-        conference_muc = f"{room}@muc.{self.settings.domain}"
+        conference_muc = self.room_to_muc(room)
         return conference_muc in self.conference_participants
 
     def register_participant_change_callback(self, callback: Callable):
@@ -1048,21 +1608,32 @@ class XMPPBot(ClientXMPP):
             callback: Async function with signature: (room: str, action: str, participant_jid: str)
                      action will be "joined" or "left"
         """
-        self.participant_change_callbacks.append(callback)
+        self.participant_change_callbacks += ((callback, asyncio.iscoroutinefunction(callback)),)
         self.logger(f"Registered participant change callback: {callback.__name__}")
 
     async def _notify_participant_change(self, room: str, action: str, participant_jid: str):
         """Notify all registered callbacks of participant change (Phase 3)."""
-        for callback in self.participant_change_callbacks:
+        for callback, is_coro in self.participant_change_callbacks:
             try:
-                if asyncio.iscoroutinefunction(callback):
+                if is_coro:
                     await callback(room, action, participant_jid)
                 else:
                     callback(room, action, participant_jid)
             except Exception as e:
-                self.logger(f"❌ Error in participant change callback: {e}")
-                import traceback
-                self.logger(f"Traceback: {traceback.format_exc()}")
+                self._log_exception("❌ Error in participant change callback", e)
+
+    async def _drain_participant_changes(self):
+        """
+        Single long-running consumer for join/leave events queued by `_track_participant_*`.
+        Drains everything pending per wakeup, so a presence burst at conference start
+        is delivered in order without a Task per participant.
+        """
+        while True:
+            batch = [await self._pc_queue.get()]
+            while not self._pc_queue.empty():
+                batch.append(self._pc_queue.get_nowait())
+            for room, action, participant_id in batch:
+                await self._notify_participant_change(room, action, participant_id)
 
     def _on_conference_participant_online(self, room: str, presence):
         """
@@ -1074,15 +1645,15 @@ class XMPPBot(ClientXMPP):
         """
         # Extract participant nick from presence 'from' field
         # Format: "room@muc.domain/participantNick"
-        participant_jid = str(presence['from'])
-        if '/' in participant_jid:
-            participant_nick = participant_jid.split('/')[-1]
-        else:
-            participant_nick = participant_jid
+        # The JID is already parsed: read the nick from its resource instead of re-splitting str(jid)
+        sender = presence['from']
+        participant_nick = sender.resource or sender.bare
         
-        # Skip the recorder bot itself
-        if participant_nick == "recorder-bot":
+        # Skip the recorder bot itself (before any presence parsing or interning)
+        if participant_nick == self.BOT_NICK:
             return
+        # Interned: the nick is reused as a key across the participant dicts
+        participant_nick = sys.intern(participant_nick)
         
         # Parse participant metadata
         participant_data = self._parse_participant_from_presence(presence)
@@ -1099,147 +1670,38 @@ class XMPPBot(ClientXMPP):
             presence: Presence stanza
         """
         # Extract participant nick
-        participant_jid = str(presence['from'])
-        if '/' in participant_jid:
-            participant_nick = participant_jid.split('/')[-1]
-        else:
-            participant_nick = participant_jid
+        # The JID is already parsed: read the nick from its resource instead of re-splitting str(jid)
+        sender = presence['from']
+        participant_nick = sender.resource or sender.bare
         
         # Skip the recorder bot itself
-        if participant_nick == "recorder-bot":
+        if participant_nick == self.BOT_NICK:
             return
+        participant_nick = sys.intern(participant_nick)
         
         # Track participant leaving
         self._track_participant_leave(room, participant_nick)
 
 
-    async def allocate_colibri_v1(self, conference_id: str, endpoint_id: str) -> Dict[str, Any]:
-        """
-        Allocates an audio channel using the legacy Colibri v1 protocol.
-        Namespace: http://jitsi.org/protocol/colibri
-        """
-        from slixmpp.exceptions import IqError, IqTimeout
-
-        if not self.bridge_jid:
-            raise RuntimeError("Bridge JID not discovered")
-
-        self.logger(f"📡 Allocating Colibri v1 Channel on {self.bridge_jid}...")
-
-        # 1. Construct the IQ
-        iq = self.make_iq_set(ito=self.bridge_jid)
-
-        # <conference xmlns='http://jitsi.org/protocol/colibri' id='...'>
-        # Note: If conference_id is None/Empty, JVB creates a new one.
-        conference = ET.Element('{http://jitsi.org/protocol/colibri}conference')
-        if conference_id:
-            conference.set('id', conference_id)
-
-        # <content name='audio'>
-        content = ET.Element('{http://jitsi.org/protocol/colibri}content')
-        content.set('name', 'audio')
-
-        # <channel initiator='true' expire='60'>
-        # 'initiator=true' asks JVB to start the ICE connectivity checks
-        channel = ET.Element('{http://jitsi.org/protocol/colibri}channel')
-        channel.set('initiator', 'true')
-        channel.set('expire', '180')  # 3 minutes expiry (refresh with simple IQs)
-
-        # <payload-type .../> (Standard Opus)
-        payload = ET.Element('{http://jitsi.org/protocol/colibri}payload-type')
-        payload.set('id', '111')
-        payload.set('name', 'opus')
-        payload.set('clockrate', '48000')
-        payload.set('channels', '2')
-
-        # <transport xmlns='urn:xmpp:jingle:transports:ice-udp:1'/>
-        # We send an empty transport to tell JVB "Allocate ICE candidates for me"
-        transport = ET.Element('{urn:xmpp:jingle:transports:ice-udp:1}transport')
-
-        # Assemble structure
-        channel.append(payload)
-        channel.append(transport)
-        content.append(channel)
-        conference.append(content)
-        iq.append(conference)
-
-        try:
-            # 2. Send and Await Reply
-            result = await iq.send(timeout=10)
-            self.logger("✅ Colibri v1 Allocation Success!")
-
-            # 3. Parse Response (Extract JVB's ICE Candidates)
-            # The response mirrors the request but fills in 'id', 'ufrag', 'pwd', and 'candidates'
-            resp_conf = result.find('{http://jitsi.org/protocol/colibri}conference')
-            resp_content = resp_conf.find('{http://jitsi.org/protocol/colibri}content')
-            resp_channel = resp_content.find('{http://jitsi.org/protocol/colibri}channel')
-            resp_transport = resp_channel.find('{urn:xmpp:jingle:transports:ice-udp:1}transport')
-
-            allocation_data = {
-                "conference_id": resp_conf.get('id'),
-                "channel_id": resp_channel.get('id'),
-                "ufrag": resp_transport.get('ufrag') if resp_transport is not None else None,
-                "pwd": resp_transport.get('pwd') if resp_transport is not None else None,
-                "candidates": []
-            }
-
-            if resp_transport is not None:
-                for cand in resp_transport.findall('{urn:xmpp:jingle:transports:ice-udp:1}candidate'):
-                    allocation_data["candidates"].append({
-                        "ip": cand.get('ip'),
-                        "port": cand.get('port'),
-                        "proto": cand.get('protocol'),
-                        "type": cand.get('type'),
-                        "foundation": cand.get('foundation'),
-                        "component": cand.get('component'),
-                        "priority": cand.get('priority')
-                    })
-
-            self.logger(f"📦 JVB Candidates: {len(allocation_data['candidates'])} found")
-            self.logger(f"📦 Conference ID: {allocation_data['conference_id']}")
-            self.logger(f"📦 Channel ID: {allocation_data['channel_id']}")
-
-            return allocation_data
-
-        except IqError as e:
-            error_condition = e.iq['error']['condition']
-            self.logger(f"❌ JVB rejected allocation: {error_condition}")
-            self.logger(f"Full error IQ: {e.iq}")
-            raise
-        except IqTimeout:
-            self.logger("❌ JVB allocation timed out")
-            raise
-        except Exception as e:
-            self.logger(f"❌ Unexpected error during Colibri v1 allocation: {e}")
-            import traceback
-            self.logger(f"Traceback: {traceback.format_exc()}")
-            raise
-
     async def run(self):
         """
         Main async method to connect and run until disconnected.
         Use this in asyncio.create_task() within FastAPI lifespan.
         """
-        # Fix: Create disconnected Future in async context where event loop is running
-        self.disconnected = asyncio.Future()
+        # Participant change notifications are delivered from this one task
+        if self._pc_task is None or self._pc_task.done():
+            self._pc_task = asyncio.create_task(self._drain_participant_changes())
 
         # Connect to XMPP server
         self.logger(f"XMPP connecting to {self.settings.host}:{self.settings.port}")
 
         # Disable cert verification for development (Prosody uses self-signed certs)
-        import ssl
-        self.ssl_context = ssl.create_default_context()
-        self.ssl_context.check_hostname = False
-        self.ssl_context.verify_mode = ssl.CERT_NONE
-
-        # connect() signature changed between slixmpp versions
-        # 1.8.x: connect(address=None) where address is a tuple (host, port)
-        # 1.9+: connect(host=None, port=None) as separate keyword args
-        # Try the 1.9+ style first, fall back to 1.8.x style
-        try:
-            # Try slixmpp 1.9+ style (keyword arguments)
+        self.ssl_context = _dev_ssl_context()
+
+        # connect() signature changed between slixmpp versions (see _SLIX_CONNECT_NEW_API)
+        if _SLIX_CONNECT_NEW_API:
             await self.connect(host=self.settings.host, port=self.settings.port)
-        except TypeError:
-            # Fall back to slixmpp 1.8.x style (tuple argument)
+        else:
             await self.connect(address=(self.settings.host, self.settings.port))
         self.logger("XMPP connection initiated")
 
@@ -1247,108 +1709,151 @@ class XMPPBot(ClientXMPP):
         await self.ready.wait()
         self.logger("XMPP bot ready")
 
+        # JVB REST client lives as long as the XMPP session
+        self._http_client()
+
         # Run until disconnected
-        await self.disconnected
+        try:
+            await self.session_closed.wait()
+        finally:
+            await self._http.aclose()
 
-    async def allocate_forwarder(self, conference_id: str, endpoint_id: str) -> Dict[str, Any]:
-        """
-        Allocate a forwarder using Colibri v1 (legacy protocol).
-        Colibri2 is not supported by this JVB version.
+    async def _wait_for_conference_id(self, key: str, timeout: float) -> Optional[str]:
         """
-        self.logger(f"Allocating forwarder for conference={conference_id}, endpoint={endpoint_id}")
-
-        try:
-            # Use Colibri v1 allocation
-            allocation_data = await self.allocate_colibri_v1(conference_id, endpoint_id)
+        Wait until a conference ID is stored for `key` (see `_set_conference_id`).
 
-            # Return response in compatible format
-            return {
-                "id": allocation_data["channel_id"],
-                "conference_id": allocation_data["conference_id"],
-                "bridge_jid": self.bridge_jid,
-                "ufrag": allocation_data["ufrag"],
-                "pwd": allocation_data["pwd"],
-                "candidates": allocation_data["candidates"],
-                "forwarder": {
-                    # For now, we'll extract the first candidate if available
-                    "ip": allocation_data["candidates"][0]["ip"] if allocation_data["candidates"] else None,
-                    "port": allocation_data["candidates"][0]["port"] if allocation_data["candidates"] else None,
-                }
-            }
-        except Exception as e:
-            self.logger(f"Failed to allocate forwarder: {e}")
-            raise
+        Args:
+            key: Full MUC JID or short room name
+            timeout: Seconds to wait
 
-    async def release_forwarder(self, conference_id: str, endpoint_id: str) -> None:
-        """Release an endpoint from JVB."""
-        if not self.bridge_jid:
-            self.logger("No bridge JID available for release")
-            return
+        Returns:
+            The conference ID, or None if none arrived in time
+        """
         try:
-            iq = Colibri2IQ.build_release(conference_id, endpoint_id)
-            iq.attrib["to"] = self.bridge_jid
-            await self._send_iq_async(iq)
-            self.logger(f"Released endpoint {endpoint_id} from conference {conference_id}")
-        except Exception as e:
-            self.logger(f"Failed to release endpoint: {e}")
+            await asyncio.wait_for(self.conference_id_events[key].wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.conference_ids.get(key)
+
+    def _set_conference_id(self, key: str, conference_id: str):
+        """
+        Store a room -> conference ID mapping and wake anyone waiting on it.
 
-    async def _send_iq_async(self, iq_elem: ET.Element) -> ET.Element:
-        future = self.Iq()
-        future.append(iq_elem[0])
-        future["to"] = iq_elem.attrib.get("to")
-        future["type"] = "set"
-        resp = await future.send()
-        return resp.xml
+        Args:
+            key: Full MUC JID or short room name
+            conference_id: Colibri conference ID (meeting-id / bridge session ID)
+        """
+        # Interned: the same room keys are looked up on every start/stop/allocation
+        key = sys.intern(key)
+        self.conference_ids[key] = conference_id
+        self.conference_id_events[key].set()
+
+    def _http_client(self) -> httpx.AsyncClient:
+        """Return the shared JVB REST client, creating it if run() has not done so yet."""
+        if self._http is None or self._http.is_closed:
+            # The transport owns the keep-alive pool and retries failed connects
+            # (refused/reset while JVB restarts) up to 3 times with backoff
+            transport = httpx.AsyncHTTPTransport(
+                retries=3,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=60),
+            )
+            self._http = httpx.AsyncClient(
+                transport=transport,
+                timeout=10.0,
+                headers=self._JSON_HEADERS,
+            )
+        return self._http
 
-    def _resolve_conference_id_via_debug(self, room_name: str) -> Optional[str]:
+    async def _resolve_conference_id_via_debug(self, room_name: str) -> Optional[str]:
         """
         Resolve JVB conference ID using the JVB debug endpoint.
         This is a fallback when Jingle/Colibri2 mapping fails.
+
+        Results are reused for `_DEBUG_CACHE_TTL` seconds so back-to-back start/stop
+        fallbacks for a room share one fetch; a JVB 404 drops the entry
+        (`_invalidate_debug_cache`) so a stale ID is never served twice.
+        """
+        now = time.monotonic()
+        cached = self._debug_cache.get(room_name)
+        if cached is not None and now - cached[0] < self._DEBUG_CACHE_TTL:
+            return cached[1]
+
+        # Single-flight: one fetch indexes every conference on the bridge, so
+        # concurrent callers (any room) await the fetch already in progress
+        if self._debug_inflight is None:
+            self.logger(f"🔍 Resolving conference ID via {self.jvb_rest_url}/debug")
+            self._debug_inflight = asyncio.ensure_future(self._index_jvb_debug())
+            self._debug_inflight.add_done_callback(self._clear_debug_inflight)
+        name_to_id = await asyncio.shield(self._debug_inflight)
+        if name_to_id is None:
+            return None
+
+        final_id = name_to_id.get(room_name) or name_to_id.get(self._short(room_name))
+        if final_id is None:
+            self.logger(f"❌ Room {room_name} not found in JVB debug output")
+            return None
+
+        self.logger(f"✅ Resolved {room_name} -> {final_id} (via debug)")
+        # Only the requested room is cached (the index lists every room on the
+        # bridge); expired entries are dropped here so the cache stays bounded
+        now = time.monotonic()
+        for name in [n for n, (stamp, _) in self._debug_cache.items() if now - stamp >= self._DEBUG_CACHE_TTL]:
+            del self._debug_cache[name]
+        self._debug_cache[room_name] = (now, final_id)
+        return final_id
+
+    def _clear_debug_inflight(self, fut: asyncio.Future):
+        """Done-callback: let the next resolution start a fresh fetch."""
+        if self._debug_inflight is fut:
+            self._debug_inflight = None
+
+    def _invalidate_debug_cache(self, room_name: str):
+        """Forget the cached debug resolution for a room (JVB rejected its ID)."""
+        self._debug_cache.pop(room_name, None)
+
+    async def _index_jvb_debug(self) -> Optional[Dict[str, str]]:
+        """
+        Stream the JVB debug dump and build a name -> conference ID index covering
+        every conference on the bridge, keyed by both the full MUC JID and the
+        short room name.
+
+        The body is fed chunk by chunk into ijson's push parser, so the dump is
+        never held in memory whole and the event loop is never blocked.
+
+        Returns:
+            Name to conference ID map, or None if the debug endpoint failed
         """
         try:
             debug_url = f"{self.jvb_rest_url}/debug"
-            self.logger(f"🔍 Resolving conference ID via {debug_url}")
-            resp = requests.get(debug_url, timeout=5)
-            if resp.status_code != 200:
-                self.logger(f"❌ JVB debug endpoint returned {resp.status_code}")
-                return None
-            
-            data = resp.json()
-            conferences = data.get("conferences", {})
-            
-            # Normalize room name
-            target_room = room_name
-            if "@" in target_room:
-                target_room_short = target_room.split("@")[0]
-            else:
-                target_room_short = target_room
-                
-            for conf_id, conf_data in conferences.items():
-                # Check 'name' field (usually full MUC JID)
-                conf_name = conf_data.get("name", "")
-                
-                # Match against full name or short name
-                if conf_name == target_room or \
-                   (conf_name and conf_name.split("@")[0] == target_room_short):
-                    
-                    # Found it!
+            name_to_id: Dict[str, str] = {}
+
+            def index(conferences):
+                for conf_id, conf_data in conferences:
+                    # 'name' is usually the full MUC JID
+                    conf_name = conf_data.get("name")
                     # Prefer 'meeting_id' if available (Colibri2 UUID), else 'id'
-                    meeting_id = conf_data.get("meeting_id")
-                    internal_id = conf_data.get("id")
-                    
-                    final_id = meeting_id or internal_id
-                    self.logger(f"✅ Resolved {room_name} -> {final_id} (via debug)")
-                    
-                    # Cache it
-                    self.conference_ids[target_room_short] = final_id
-                    if "@" in conf_name:
-                        self.conference_ids[conf_name] = final_id
-                        
-                    return final_id
-            
-            self.logger(f"❌ Room {room_name} not found in JVB debug output")
-            return None
-            
+                    final_id = conf_data.get("meeting_id") or conf_data.get("id")
+                    if not conf_name or not final_id:
+                        continue
+                    name_to_id[conf_name] = final_id
+                    name_to_id[self._short(conf_name)] = final_id
+                del conferences[:]
+
+            async with self._http_client().stream("GET", debug_url, timeout=5) as resp:
+                if resp.status_code != 200:
+                    self.logger(f"❌ JVB debug endpoint returned {resp.status_code}")
+                    return None
+
+                conferences = ijson.sendable_list()
+                parser = ijson.kvitems_coro(conferences, "conferences")
+                async for chunk in resp.aiter_bytes():
+                    parser.send(chunk)
+                    index(conferences)
+                parser.close()
+                index(conferences)
+
+            return name_to_id
+
         except Exception as e:
             self.logger(f"❌ Error resolving via debug: {e}")
             return None
@@ -1358,12 +1863,9 @@ class XMPPBot(ClientXMPP):
         Start multitrack recording via JVB REST API.
         """
         # Normalize room name (remove domain if present)
-        if "@" in room_name:
-            room_short = room_name.split("@")[0]
-        else:
-            room_short = room_name
+        room_short = self._short(room_name)
             
-        self.logger(f"🎙️  Request to start recording for room: {room_short}")
+        self._log(logging.INFO, "🎙️  Request to start recording for room: %s", room_short)
         
         # Try to find conference ID
         conference_id = None
@@ -1372,82 +1874,65 @@ class XMPPBot(ClientXMPP):
         if room_short in self.conference_ids:
             conference_id = self.conference_ids[room_short]
             
-        # 2. If not found, wait a bit (retry loop)
+        # 2. If not found, wait for the Jingle/Colibri2 handlers to publish it
         if not conference_id:
-            for i in range(5):
-                if room_short in self.conference_ids:
-                    conference_id = self.conference_ids[room_short]
-                    break
-                self.logger(f"⏳ Waiting for conference ID mapping for {room_short} (attempt {i+1}/5)...")
-                await asyncio.sleep(0.5)
+            self._log(logging.INFO, "⏳ Waiting for conference ID mapping for %s...", room_short)
+            conference_id = await self._wait_for_conference_id(room_short, timeout=2.5)
         
-        # 3. If still not found, try debug endpoint
+        # 3. If still not found, try debug endpoint, backing off between attempts
+        #    (base 0.1s, cap 2s, up to +50% jitter) while still waking early on a mapping
         if not conference_id:
-            self.logger(f"⚠️ Conference ID not found via Jingle, trying debug endpoint...")
-            conference_id = self._resolve_conference_id_via_debug(room_short)
+            self._log(logging.WARNING, "⚠️ Conference ID not found via Jingle, trying debug endpoint...")
+            for attempt in range(3):
+                conference_id = await self._resolve_conference_id_via_debug(room_short)
+                if conference_id or attempt == 2:
+                    break
+                delay = min(2.0, 0.1 * 2 ** attempt) * (1 + random.uniform(0, 0.5))
+                conference_id = await self._wait_for_conference_id(room_short, timeout=delay)
+                if conference_id:
+                    break
             
         if not conference_id:
-            self.logger(f"❌ Could not find conference ID for room {room_short}")
+            self._log(logging.ERROR, "❌ Could not find conference ID for room %s", room_short)
             return False
             
-        self.logger(f"✅ Using conference ID: {conference_id}")
+        self._log(logging.INFO, "✅ Using conference ID: %s", conference_id)
         
         # Construct recorder WebSocket URL with room parameter
-        recorder_url = f"{self.recorder_ws_url}?room={room_short}"
-        
-        payload = {
-            "connects": [
-                {
-                    "url": recorder_url,
-                    "protocol": "mediajson",
-                "type": "recorder",
-                "audio": True,
-                    "video": False
-                }
-            ]
-        }
+        recorder_url = self._recorder_url(room_short)
+        body = self._start_bodies.get(room_short)
+        if body is None:
+            body = self._start_bodies[room_short] = json.dumps({
+                "connects": [
+                    {
+                        "url": recorder_url,
+                        "protocol": "mediajson",
+                        "type": "recorder",
+                        "audio": True,
+                        "video": False
+                    }
+                ]
+            }).encode()
         
-        url = f"{self.jvb_rest_url}/colibri/v2/conferences/{conference_id}"
+        url = self._conference_url(conference_id)
         
         try:
-            self.logger(f"🎙️  Starting multitrack recording for {conference_id} via {url}")
-            self.logger(f"📡 Recorder WebSocket URL: {recorder_url}")
+            self._log(logging.INFO, "🎙️  Starting multitrack recording for %s via %s", conference_id, url)
+            self._log(logging.DEBUG, "📡 Recorder WebSocket URL: %s", recorder_url)
             
-            response = requests.patch(
-                url,
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=10
-            )
+            response = await self._patch_with_refresh(room_short, conference_id, body)
             
             if response.status_code == 200:
-                self.logger(f"✅ Successfully started multitrack recording")
+                self._log(logging.INFO, "✅ Successfully started multitrack recording")
+                self._started_rooms.add(room_short)
                 return True
-            elif response.status_code == 404:
-                self.logger(f"❌ JVB returned 404. ID might be wrong. Retrying via debug resolution...")
-                # Force debug resolution
-                new_id = self._resolve_conference_id_via_debug(room_short)
-                if new_id and new_id != conference_id:
-                    self.logger(f"🔄 Retrying with new ID: {new_id}")
-                    url = f"{self.jvb_rest_url}/colibri/v2/conferences/{new_id}"
-                    response = requests.patch(
-                        url,
-                        json=payload,
-                        headers={"Content-Type": "application/json"},
-                        timeout=10
-                    )
-                    if response.status_code == 200:
-                        self.logger(f"✅ Successfully started multitrack recording (on retry)")
-                        return True
             
-            self.logger(f"❌ Failed to start recording: HTTP {response.status_code}")
-            self.logger(f"Response: {response.text}")
+            self._log(logging.ERROR, "❌ Failed to start recording: HTTP %s", response.status_code)
+            self._log(logging.ERROR, "Response: %s", response.content[:self._LOG_BODY_LIMIT].decode('utf-8', 'replace'))
             return False
                 
         except Exception as e:
-            self.logger(f"❌ Error calling JVB REST API: {e}")
-            import traceback
-            self.logger(f"Traceback: {traceback.format_exc()}")
+            self._log_exception("❌ Error calling JVB REST API", e)
             return False
 
     async def stop_multitrack_recording(self, room_name: str) -> bool:
@@ -1455,54 +1940,122 @@ class XMPPBot(ClientXMPP):
         Stop multitrack recording by sending empty connects array.
         """
         # Normalize room name
-        if "@" in room_name:
-            room_short = room_name.split("@")[0]
-        else:
-            room_short = room_name
+        room_short = self._short(room_name)
+
+        # Nothing to stop if we never started a recording and never saw the conference
+        if room_short not in self._started_rooms and room_short not in self.conference_ids:
+            self._log(logging.INFO, "ℹ️  No active recording for room %s", room_short)
+            return True
             
         # Look up conference ID
         conference_id = self.conference_ids.get(room_short)
         
         # Fallback to debug resolution if not found
         if not conference_id:
-             conference_id = self._resolve_conference_id_via_debug(room_short)
+             conference_id = await self._resolve_conference_id_via_debug(room_short)
         
         if not conference_id:
-            self.logger(f"❌ Could not find conference ID for room {room_short} to stop recording")
+            self._log(logging.ERROR, "❌ Could not find conference ID for room %s to stop recording", room_short)
             return False
             
-        self.logger(f"🛑 Request to stop recording for room: {room_short} (ID: {conference_id})")
-        
-        # Empty connects array stops the exporter
-        payload = {
-            "connects": []
-        }
-        
-        url = f"{self.jvb_rest_url}/colibri/v2/conferences/{conference_id}"
+        self._log(logging.INFO, "🛑 Request to stop recording for room: %s (ID: %s)", room_short, conference_id)
         
         try:
-            self.logger(f"🛑 Stopping multitrack recording for {conference_id}")
-            response = requests.patch(url, json=payload, timeout=10)
+            self._log(logging.INFO, "🛑 Stopping multitrack recording for %s", conference_id)
+            response = await self._patch_with_refresh(room_short, conference_id, self._STOP_RECORDING_BODY)
             
             if response.status_code == 200:
-                self.logger("✅ Successfully stopped multitrack recording")
+                self._log(logging.INFO, "✅ Successfully stopped multitrack recording")
+                self._started_rooms.discard(room_short)
                 return True
-            elif response.status_code == 404:
-                # Retry with debug resolution
-                new_id = self._resolve_conference_id_via_debug(room_short)
-                if new_id and new_id != conference_id:
-                    url = f"{self.jvb_rest_url}/colibri/v2/conferences/{new_id}"
-                    response = requests.patch(url, json=payload, timeout=10)
-                    if response.status_code == 200:
-                        self.logger("✅ Successfully stopped multitrack recording (on retry)")
-                        return True
                         
-            self.logger(f"❌ Failed to stop recording: HTTP {response.status_code}")
+            self._log(logging.ERROR, "❌ Failed to stop recording: HTTP %s", response.status_code)
             return False
         except Exception as e:
-            self.logger(f"❌ Error stopping recording: {e}")
+            self._log_exception("❌ Error stopping recording", e)
             return False
 
+    async def _patch_with_refresh(self, room_short: str, conference_id: str, body: bytes) -> httpx.Response:
+        """
+        PATCH a Colibri2 conference on the JVB REST API.
+
+        Transient statuses (429/5xx) are retried up to `_PATCH_RETRIES` times with
+        exponential backoff (0.3s, 0.6s, 1.2s). A 404 means the conference ID is
+        stale: the debug cache entry is dropped, the ID re-resolved and the PATCH
+        sent once more to the new ID.
+
+        Args:
+            room_short: Short room name, used for re-resolution
+            conference_id: Colibri conference ID to patch
+            body: Encoded JSON body
+
+        Returns:
+            The last response received
+        """
+        response = await self._patch_conference(conference_id, body)
+        if response.status_code == 404:
+            self._log(logging.WARNING, "❌ JVB returned 404. ID might be wrong. Retrying via debug resolution...")
+            # Force debug resolution
+            self._invalidate_debug_cache(room_short)
+            new_id = await self._resolve_conference_id_via_debug(room_short)
+            if new_id and new_id != conference_id:
+                self._log(logging.INFO, "🔄 Retrying with new ID: %s", new_id)
+                response = await self._patch_conference(new_id, body)
+        return response
+
+    def _conference_url(self, conference_id: str) -> str:
+        """JVB REST URL of a Colibri2 conference (see _colibri2_conference_url)."""
+        return _colibri2_conference_url(self.jvb_rest_url, conference_id)
+
+    def _recorder_url(self, room_short: str) -> str:
+        """Recorder WebSocket URL for a room, with the room name URL-encoded, memoized per room."""
+        url = self._recorder_urls.get(room_short)
+        if url is None:
+            url = self._recorder_urls[room_short] = f"{self.recorder_ws_url}?{urlencode({'room': room_short})}"
+        return url
+
+    async def _patch_conference(self, conference_id: str, body: bytes) -> httpx.Response:
+        """Single conference PATCH with backoff on transient statuses (see `_patch_with_refresh`)."""
+        url = self._conference_url(conference_id)
+        for attempt in range(self._PATCH_RETRIES + 1):
+            response = await self._http_client().patch(url, content=body)
+            if response.status_code not in self._RETRY_STATUSES or attempt == self._PATCH_RETRIES:
+                return response
+            delay = 0.3 * 2 ** attempt
+            self._log(logging.WARNING, "⏳ JVB returned %d, retrying PATCH in %.1fs", response.status_code, delay)
+            await asyncio.sleep(delay)
+
+    async def start_multitrack_recording_many(self, room_names: List[str]) -> List[Any]:
+        """
+        Start multitrack recording for several rooms concurrently.
+
+        Overlaps the conference-ID waits and JVB PATCH round-trips instead of
+        paying them room by room; at most `_ROOM_OP_CONCURRENCY` rooms are in flight.
+
+        Returns:
+            Per-room results in input order (bool, or the exception raised)
+        """
+        return await self._gather_room_ops(self.start_multitrack_recording, room_names)
+
+    async def stop_multitrack_recording_many(self, room_names: List[str]) -> List[Any]:
+        """
+        Stop multitrack recording for several rooms concurrently.
+
+        Returns:
+            Per-room results in input order (bool, or the exception raised)
+        """
+        return await self._gather_room_ops(self.stop_multitrack_recording, room_names)
+
+    async def _gather_room_ops(self, op: Callable, room_names: List[str]) -> List[Any]:
+        """Run `op(room)` for every room under a shared semaphore so JVB isn't flooded."""
+        sem = asyncio.Semaphore(self._ROOM_OP_CONCURRENCY)
+
+        async def bounded(room_name: str):
+            async with sem:
+                return await op(room_name)
+
+        return await asyncio.gather(*(bounded(r) for r in room_names), return_exceptions=True)
+
 
 def create_xmpp_bot_from_env(logger: Optional[Callable[[str], None]] = None) -> XMPPBot:
     settings = load_xmpp_settings()
@@ -1514,26 +2067,27 @@ def create_xmpp_bot_from_env(logger: Optional[Callable[[str], None]] = None) ->
     return bot
 
 
-class ComponentBot(ComponentXMPP):
+class ComponentBot(_LogMixin, _ColibriV1Mixin, ComponentXMPP):
     def __init__(self, settings: XMPPSettings, logger: Optional[Callable[[str], None]] = None):
         # ComponentXMPP args: (jid, secret, host, port)
         super().__init__(settings.jid, settings.password, settings.host, settings.port)
         self.settings = settings
         self.logger = logger or (lambda msg: None)
         self.bridge_jid: Optional[str] = None
+        self._bridge_ready = asyncio.Event()  # Set by muc_online once the bridge occupant is seen
         self.session_started = False
         self.add_event_handler("session_start", self.start)
         self.add_event_handler("muc::%s::got_online" % settings.bridge_muc, self.muc_online)
 
     async def start(self, event):
-        self.logger("XMPP component session started")
+        self._log(logging.INFO, "XMPP component session started")
         self.session_started = True
-        self.logger(f"Component JID: {self.boundjid}")
+        self._log(logging.INFO, "Component JID: %s", self.boundjid)
         try:
             # slixmpp v1.9.0+ requires pfrom for components joining MUC
             # Create a user JID under the component's domain
             component_user_jid = f"recorder-bot@{self.boundjid.domain}"
-            self.logger(f"Using pfrom: {component_user_jid}")
+            self._log(logging.DEBUG, "Using pfrom: %s", component_user_jid)
 
             # Join MUC with explicit pfrom (required in v1.9.0+)
             self.plugin["xep_0045"].join_muc(
@@ -1541,79 +2095,38 @@ class ComponentBot(ComponentXMPP):
                 "recorder-comp",
                 pfrom=component_user_jid
             )
-            self.logger(f"Joined MUC: {self.settings.bridge_muc}")
+            self._log(logging.INFO, "Joined MUC: %s", self.settings.bridge_muc)
 
-            # Check existing occupants after delay
-            await asyncio.sleep(2.0)  # Wait for MUC roster
-            roster = self.plugin["xep_0045"].get_roster(self.settings.bridge_muc)
-            self.logger(f"MUC roster has {len(roster) if roster else 0} occupants")
+            # Wake as soon as muc_online sees the bridge; the roster scan below
+            # is only a fallback if no such presence arrives in time
+            try:
+                await asyncio.wait_for(self._bridge_ready.wait(), timeout=5.0)
+                return
+            except asyncio.TimeoutError:
+                self._log(logging.WARNING, "No bridge presence within 5s, scanning MUC roster")
+
+            muc = self.plugin["xep_0045"]
+            roster = muc.get_roster(self.settings.bridge_muc)
+            self._log(logging.INFO, "MUC roster has %d occupants", len(roster) if roster else 0)
             if roster:
+                # get_roster() returns nicks; the real JID is a per-nick property
                 for nick in roster:
-                    jid_obj = roster[nick].get("jid")
-                    jid = str(jid_obj) if jid_obj else None
-                    self.logger(f"Occupant {nick}: JID={jid}")
-                    if jid and "@internal" in jid:
-                        self.bridge_jid = jid
-                        self.logger(f"Found existing bridge JID: {self.bridge_jid}")
+                    jid_obj = muc.get_jid_property(self.settings.bridge_muc, nick, "jid")
+                    self._log(logging.DEBUG, "Occupant %s: JID=%s", nick, jid_obj)
+                    if jid_obj and jid_obj.domain == self.settings.jvb_internal_domain:
+                        self.bridge_jid = jid_obj.bare
+                        self._bridge_ready.set()
+                        self._log(logging.INFO, "Found existing bridge JID: %s", self.bridge_jid)
                         break
             else:
-                self.logger("MUC roster is empty or None")
+                self._log(logging.WARNING, "MUC roster is empty or None")
         except Exception as e:
-            self.logger(f"Failed to join bridge MUC: {e}")
+            self._log(logging.ERROR, "Failed to join bridge MUC: %s", e)
 
     def muc_online(self, presence):
         occupant = presence["muc"]["jid"]
         self.logger(f"ComponentBot: MUC occupant online: {occupant}")
-        if occupant and occupant.bare and "@internal" in occupant.bare:
+        if occupant and occupant.domain == self.settings.jvb_internal_domain:
             self.bridge_jid = occupant.bare
+            self._bridge_ready.set()
             self.logger(f"Discovered bridge JID: {self.bridge_jid}")
-
-    async def allocate_forwarder(self, conference_id: str, endpoint_id: str) -> Dict[str, Any]:
-        """
-        Allocate a forwarder using Colibri v1 (legacy protocol).
-        Colibri2 is not supported by this JVB version.
-        """
-        self.logger(f"Allocating forwarder for conference={conference_id}, endpoint={endpoint_id}")
-
-        try:
-            # Use Colibri v1 allocation
-            allocation_data = await self.allocate_colibri_v1(conference_id, endpoint_id)
-
-            # Return response in compatible format
-            return {
-                "id": allocation_data["channel_id"],
-                "conference_id": allocation_data["conference_id"],
-                "bridge_jid": self.bridge_jid,
-                "ufrag": allocation_data["ufrag"],
-                "pwd": allocation_data["pwd"],
-                "candidates": allocation_data["candidates"],
-                "forwarder": {
-                    # For now, we'll extract the first candidate if available
-                    "ip": allocation_data["candidates"][0]["ip"] if allocation_data["candidates"] else None,
-                    "port": allocation_data["candidates"][0]["port"] if allocation_data["candidates"] else None,
-                }
-            }
-        except Exception as e:
-            self.logger(f"Failed to allocate forwarder: {e}")
-            raise
-
-    async def release_forwarder(self, conference_id: str, endpoint_id: str) -> None:
-        """Release an endpoint from JVB."""
-        if not self.bridge_jid:
-            self.logger("No bridge JID available for release")
-            return
-        try:
-            iq = Colibri2IQ.build_release(conference_id, endpoint_id)
-            iq.attrib["to"] = self.bridge_jid
-            await self._send_iq_async(iq)
-            self.logger(f"Released endpoint {endpoint_id} from conference {conference_id}")
-        except Exception as e:
-            self.logger(f"Failed to release endpoint: {e}")
-
-    async def _send_iq_async(self, iq_elem: ET.Element) -> ET.Element:
-        future = self.Iq()
-        future.append(iq_elem[0])
-        future["to"] = iq_elem.attrib.get("to")
-        future["type"] = "set"
-        resp = await future.send()
-        return resp.xml
@@ -1,3 +1,4 @@
+import functools
 import os
 from dataclasses import dataclass
 
@@ -10,17 +11,27 @@ class XMPPSettings:
     password: str
     bridge_muc: str
     mode: str  # "client" or "component"
+    jvb_internal_domain: str  # Domain of the JVB's real JID in the brewery MUC
 
 
+@functools.lru_cache(maxsize=1)
 def load_xmpp_settings() -> XMPPSettings:
+    """
+    Read XMPP settings from the environment.
+
+    The environment is read once per process; call `load_xmpp_settings.cache_clear()`
+    to pick up changes (e.g. on SIGHUP). The returned settings are shared, do not mutate them.
+    """
+    env = os.environ
     # Component mode wins if component secret/jid provided
-    comp_secret = os.environ.get("XMPP_COMPONENT_SECRET")
-    comp_jid = os.environ.get("XMPP_COMPONENT_JID")
+    comp_secret = env.get("XMPP_COMPONENT_SECRET")
+    comp_jid = env.get("XMPP_COMPONENT_JID")
     if comp_secret and comp_jid:
-        host = os.environ.get("XMPP_COMPONENT_HOST") or "xmpp.meet.jitsi"
-        port = int(os.environ.get("XMPP_COMPONENT_PORT", "5347"))
-        domain = os.environ.get("XMPP_DOMAIN") or "meet.jitsi"
-        bridge_muc = os.environ.get("JVB_BRIDGE_MUC", "jvbbrewery@internal-muc.meet.jitsi")
+        host = env.get("XMPP_COMPONENT_HOST") or "xmpp.meet.jitsi"
+        port = int(env.get("XMPP_COMPONENT_PORT", "5347"))
+        domain = env.get("XMPP_DOMAIN") or "meet.jitsi"
+        bridge_muc = env.get("JVB_BRIDGE_MUC", "jvbbrewery@internal-muc.meet.jitsi")
+        jvb_internal_domain = env.get("JVB_INTERNAL_DOMAIN") or f"internal.auth.{domain}"
         return XMPPSettings(
             host=host,
             port=port,
@@ -29,14 +40,16 @@ def load_xmpp_settings() -> XMPPSettings:
             password=comp_secret,
             bridge_muc=bridge_muc,
             mode="component",
+            jvb_internal_domain=jvb_internal_domain,
         )
 
-    host = os.environ.get("XMPP_HOST") or os.environ.get("XMPP_SERVER") or "xmpp.meet.jitsi"
-    port = int(os.environ.get("XMPP_PORT", "5222"))
-    domain = os.environ.get("XMPP_DOMAIN") or "meet.jitsi"
-    jid = os.environ.get("XMPP_JID")
-    password = os.environ.get("XMPP_PASSWORD")
-    bridge_muc = os.environ.get("JVB_BRIDGE_MUC", "jvbbrewery@internal-muc.meet.jitsi")
+    host = env.get("XMPP_HOST") or env.get("XMPP_SERVER") or "xmpp.meet.jitsi"
+    port = int(env.get("XMPP_PORT", "5222"))
+    domain = env.get("XMPP_DOMAIN") or "meet.jitsi"
+    jid = env.get("XMPP_JID")
+    password = env.get("XMPP_PASSWORD")
+    bridge_muc = env.get("JVB_BRIDGE_MUC", "jvbbrewery@internal-muc.meet.jitsi")
+    jvb_internal_domain = env.get("JVB_INTERNAL_DOMAIN") or f"internal.auth.{domain}"
     if not jid or not password:
         raise ValueError("XMPP_JID and XMPP_PASSWORD (or component creds) are required")
     return XMPPSettings(
@@ -47,4 +60,5 @@ def load_xmpp_settings() -> XMPPSettings:
         password=password,
         bridge_muc=bridge_muc,
         mode="client",
+        jvb_internal_domain=jvb_internal_domain,
     )